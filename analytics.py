@@ -0,0 +1,107 @@
+import numpy as np
+
+from timer import NS_PER_SECOND
+
+DEFAULT_BIN_SECONDS = 30
+
+
+def event_arrays(events):
+    """Copy an EventLog into NumPy arrays (times in ns, slots).
+
+    The arrays are copied rather than viewed so the EventLog can keep
+    growing while the analysis runs.
+    """
+    times = np.frombuffer(events.times, dtype=np.int64).copy() if len(events) else np.empty(0, np.int64)
+    slots = np.frombuffer(events.slots, dtype=np.uint32).copy() if len(events) else np.empty(0, np.uint32)
+    return times, slots
+
+
+def rollup_arrays(events):
+    """The rollup of a long-run EventLog as NumPy arrays (bucket times, slots, counts); None for a plain one."""
+    rollup = events.rollup()
+    if rollup is None:
+        return None
+    times, slots, counts = rollup
+    return np.array(times, dtype=np.int64), np.array(slots, dtype=np.int64), np.array(counts, dtype=np.int64)
+
+
+def analyze(times, slots, counters, elapsed, bin_seconds=DEFAULT_BIN_SECONDS, rollup=None):
+    """Compute per-counter rates, time bins, cumulative curves and inter-event intervals.
+
+    times/slots are the event arrays (see event_arrays), counters an iterable
+    of (key, name, slot) and elapsed the session length in seconds. Every
+    statistic is computed with array operations over all events at once;
+    the only Python loop is over counters when the result is assembled.
+
+    For a long run, rollup holds the counts folded out of the event arrays
+    (see rollup_arrays). They are added to the totals, rates and bins
+    (each at the start of its bucket); intervals come from the events alone.
+    """
+    counters = list(counters)
+    n_slots = max(max((slot for _, _, slot in counters), default=-1), int(slots.max()) if slots.size else -1) + 1
+    if rollup is not None and rollup[1].size:
+        n_slots = max(n_slots, int(rollup[1].max()) + 1)
+    n_bins = max(1, int(np.ceil(elapsed / bin_seconds))) if elapsed > 0 else 1
+    bin_ns = int(bin_seconds * NS_PER_SECOND)
+
+    slots = slots.astype(np.int64)
+    totals = np.bincount(slots, minlength=n_slots)
+
+    # Counts per (slot, bin) in a single bincount over a combined index
+    bins_idx = np.minimum(times // bin_ns, n_bins - 1)
+    bins = np.bincount(slots * n_bins + bins_idx, minlength=n_slots * n_bins).reshape(n_slots, n_bins)
+    if rollup is not None:
+        r_times, r_slots, r_counts = rollup
+        totals = totals + np.bincount(r_slots, weights=r_counts, minlength=n_slots).astype(np.int64)
+        r_bins = np.minimum(r_times // bin_ns, n_bins - 1)
+        bins = bins + np.bincount(r_slots * n_bins + r_bins, weights=r_counts,
+                                  minlength=n_slots * n_bins).astype(np.int64).reshape(n_slots, n_bins)
+    cumulative = np.cumsum(bins, axis=1)
+
+    # Inter-event intervals: group by slot (events are recorded in time order, so a
+    # stable sort keeps each group chronological) and diff neighbours that share a slot
+    order = np.argsort(slots, kind='stable')
+    sorted_times, sorted_slots = times[order], slots[order]
+    same = sorted_slots[1:] == sorted_slots[:-1]
+    intervals = np.diff(sorted_times)[same] / NS_PER_SECOND
+    interval_slots = sorted_slots[1:][same]
+    n_intervals = np.bincount(interval_slots, minlength=n_slots)
+    interval_sum = np.bincount(interval_slots, weights=intervals, minlength=n_slots)
+    interval_sq = np.bincount(interval_slots, weights=intervals * intervals, minlength=n_slots)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        interval_mean = interval_sum / n_intervals
+        interval_std = np.sqrt(np.maximum(interval_sq / n_intervals - interval_mean ** 2, 0))
+    # Intervals are grouped by slot already, so each slot's block can be sliced out for min/max/median
+    bounds = np.searchsorted(interval_slots, np.arange(n_slots + 1))
+
+    minutes = elapsed / 60
+    result = []
+    for key, name, slot in counters:
+        block = intervals[bounds[slot]:bounds[slot + 1]]
+        has_intervals = block.size > 0
+        result.append({
+            'key': key,
+            'name': name,
+            'count': int(totals[slot]),
+            'rate_per_min': float(totals[slot] / minutes) if minutes > 0 else 0.0,
+            'bins': bins[slot],
+            'cumulative': cumulative[slot],
+            'interval_mean': float(interval_mean[slot]) if has_intervals else None,
+            'interval_median': float(np.median(block)) if has_intervals else None,
+            'interval_min': float(block.min()) if has_intervals else None,
+            'interval_max': float(block.max()) if has_intervals else None,
+            'interval_std': float(interval_std[slot]) if has_intervals else None,
+        })
+    return {
+        'elapsed': elapsed,
+        'bin_seconds': bin_seconds,
+        'bin_starts': np.arange(n_bins) * bin_seconds,
+        'counters': result,
+    }
+
+
+def analyze_engine(engine, bin_seconds=DEFAULT_BIN_SECONDS):
+    """Analyze the current run of a CounterEngine."""
+    times, slots = event_arrays(engine.events)
+    counters = [(key, engine.counters.names[slot], slot) for key, slot in engine.counters.index.items()]
+    return analyze(times, slots, counters, engine.elapsed_time, bin_seconds, rollup_arrays(engine.events))
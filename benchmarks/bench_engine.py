@@ -0,0 +1,87 @@
+"""Headless keypress latency: the input, engine, journal and render-marking path without Tk.
+
+Synthetic key streams are fed at fixed input rates; latency is measured
+from the moment a press was due to the moment it was counted, so falling
+behind the input rate shows up as growing latency. Batched throughput
+(increment_many, as the ingest queue drains) is measured separately.
+
+    python benchmarks/bench_engine.py
+"""
+import os
+import tempfile
+import time
+
+from common import FakeKeyEvent, counter_config, key_names, summarize
+
+from engine import CounterEngine
+from journal import JournalWriter
+from keyinput import InputEngine
+from registry import key_from_event
+
+COUNTER_SIZES = (1, 10, 100, 1000, 2500)
+RATES = (1000, 20000, None)  # Presses per second; None feeds as fast as possible
+PRESSES = 20000
+RATED_SECONDS = 1  # Rate-limited streams run for at most this long
+BATCH = 256  # Presses per increment_many call
+
+
+def bench(n_counters, rate, presses, directory):
+    keys = key_names(n_counters)
+    engine = CounterEngine(counter_config(n_counters), duration=10 ** 9)
+    engine.start()
+    engine.attach_journal(JournalWriter(os.path.join(directory, f"bench-{n_counters}-{rate}.journal")))
+    press = InputEngine(engine.counters).press
+    dirty = {}
+    engine.subscribe('increment', lambda key, slot: dirty.setdefault(key))  # What the render scheduler does
+    if rate:
+        presses = min(presses, int(rate * RATED_SECONDS))
+    events = [FakeKeyEvent(keys[i % n_counters]) for i in range(presses)]
+    interval = 1 / rate if rate else 0
+    samples = []
+    clock = time.perf_counter
+    start = clock()
+    for i, event in enumerate(events):
+        due = start + i * interval
+        if rate:
+            while clock() < due:
+                pass
+        else:
+            due = clock()
+        engine.increment(press(key_from_event(event)))
+        samples.append(clock() - due)
+    elapsed = clock() - start
+    engine.stop()
+    metrics = summarize(f"engine_keypress_{n_counters}_{rate or 'max'}", samples)
+    if not rate:
+        metrics[f"engine_keypress_{n_counters}_per_s"] = presses / elapsed
+    return metrics
+
+
+def bench_batch(n_counters, presses, directory):
+    keys = key_names(n_counters)
+    engine = CounterEngine(counter_config(n_counters), duration=10 ** 9)
+    engine.start()
+    engine.attach_journal(JournalWriter(os.path.join(directory, f"batch-{n_counters}.journal")))
+    batches = [[keys[i % n_counters] for i in range(start, min(start + BATCH, presses))] for start in range(0, presses, BATCH)]
+    start = time.perf_counter()
+    for batch in batches:
+        engine.increment_many(batch)
+    elapsed = time.perf_counter() - start
+    engine.stop()
+    return {f"engine_batch_{n_counters}_per_s": presses / elapsed}
+
+
+def run(quick=False):
+    presses = PRESSES // 50 if quick else PRESSES
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n in COUNTER_SIZES:
+            for rate in RATES:
+                metrics.update(bench(n, rate, presses, directory))
+            metrics.update(bench_batch(n, presses, directory))
+    return metrics
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>40}  {value:12.3f}")
@@ -0,0 +1,67 @@
+"""Export throughput (rows per second) for every dataset and format.
+
+Parquet is measured only when pyarrow is installed, bins only with NumPy.
+
+    python benchmarks/bench_export.py
+"""
+import os
+import random
+import tempfile
+import time
+
+from common import counter_config, key_names
+
+from engine import CounterEngine
+from export import ExportSource, export
+
+EVENTS = 1_000_000
+COUNTERS = 50
+
+
+def available_formats():
+    formats = ['csv', 'jsonl']
+    try:
+        import pyarrow  # noqa: F401
+        formats.append('parquet')
+    except ImportError:
+        pass
+    return formats
+
+
+def build_engine(n_events):
+    keys = key_names(COUNTERS)
+    engine = CounterEngine(counter_config(COUNTERS), duration=10 ** 9)
+    engine.start()
+    rng = random.Random(0)
+    engine.increment_many(rng.choice(keys) for _ in range(n_events))
+    engine.stop()
+    return engine
+
+
+def run(quick=False):
+    engine = build_engine(EVENTS // 10 if quick else EVENTS)
+    datasets = ['totals', 'events']
+    try:
+        import numpy  # noqa: F401
+        datasets.insert(1, 'bins')
+    except ImportError:
+        pass
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in available_formats():
+            for dataset in datasets:
+                source = ExportSource(engine, bin_seconds=1)
+                path = os.path.join(directory, f"{dataset}.{fmt}")
+                written = []
+                start = time.perf_counter()
+                export(source, dataset, path, written.append)
+                elapsed = time.perf_counter() - start
+                metrics[f"export_{dataset}_{fmt}_s"] = elapsed
+                if dataset == 'events':
+                    metrics[f"export_{dataset}_{fmt}_rows_per_s"] = sum(written) / elapsed
+    return metrics
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>40}  {value:12.3f}")
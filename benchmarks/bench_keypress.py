@@ -0,0 +1,60 @@
+"""Measure keypress-to-display latency of AdvancedCounter as the number of counters grows.
+
+Run from the repository root (needs a display, e.g. under xvfb-run):
+
+    python benchmarks/bench_keypress.py
+"""
+import os
+import tempfile
+import time
+
+from common import FakeKeyEvent, counter_config, isolated_env, key_names, summarize
+
+COUNTER_SIZES = (1, 10, 30, 60, 120, 240, 1000)
+PRESSES = 500
+
+requires_display = True
+
+
+def bench(app, n_counters, presses=PRESSES):
+    keys = key_names(n_counters)
+    engine = app.current_view().engine
+    engine.load_counters(counter_config(n_counters))
+    app.update_idletasks()
+    engine.start(duration=10 ** 9)
+    samples = []
+    for i in range(presses):
+        event = FakeKeyEvent(keys[i % n_counters])
+        start = time.perf_counter()
+        app.handle_key_press(event)
+        app.renderer.flush()  # Draw the frame the keypress scheduled instead of waiting for it
+        app.update_idletasks()  # Include the redraw caused by the keypress
+        samples.append(time.perf_counter() - start)
+        app.handle_key_release(event)
+    engine.reset()
+    return samples
+
+
+def run(quick=False):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.update(isolated_env(directory))
+        from counter import AdvancedCounter
+        app = AdvancedCounter()
+        app.save_config = lambda config: None  # Never touch the real config from the benchmark
+        metrics = {}
+        for n in COUNTER_SIZES:
+            metrics.update(summarize(f"keypress_{n}", bench(app, n, PRESSES // 5 if quick else PRESSES)))
+        app.on_close()
+    return metrics
+
+
+def main():
+    metrics = run()
+    print(f"{'counters':>8}  {'mean (ms)':>10}  {'p95 (ms)':>10}  {'max (ms)':>10}")
+    for n in COUNTER_SIZES:
+        mean, p95, worst = (metrics[f"keypress_{n}_{stat}_ms"] for stat in ('mean', 'p95', 'max'))
+        print(f"{n:>8}  {mean:>10.3f}  {p95:>10.3f}  {worst:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
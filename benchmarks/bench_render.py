@@ -0,0 +1,59 @@
+"""Counter grid cost: rebuilding the display and scrolling it, by counter count.
+
+Needs a display (e.g. under xvfb-run). The app runs against a temporary
+data directory so no real config or session is touched.
+
+    python benchmarks/bench_render.py
+"""
+import os
+import tempfile
+import time
+
+from common import counter_config, isolated_env, summarize
+
+COUNTER_SIZES = (10, 100, 1000, 2500)
+REPEATS = 5
+SCROLL_STEPS = 50
+
+requires_display = True
+
+
+def bench(app, n_counters, repeats):
+    view = app.current_view()
+    config = counter_config(n_counters)
+    rebuild = []
+    for _ in range(repeats):
+        view.engine.load_counters([])
+        app.update_idletasks()
+        start = time.perf_counter()
+        view.engine.load_counters(config)  # Rebuilds the grid through the 'counters' event
+        app.update_idletasks()
+        rebuild.append(time.perf_counter() - start)
+    scroll = []
+    for step in range(SCROLL_STEPS):
+        start = time.perf_counter()
+        view.counter_grid.yview('moveto', step / SCROLL_STEPS)
+        app.update_idletasks()
+        scroll.append(time.perf_counter() - start)
+    metrics = summarize(f"render_display_{n_counters}", rebuild)
+    metrics.update(summarize(f"render_scroll_{n_counters}", scroll))
+    return metrics
+
+
+def run(quick=False):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.update(isolated_env(directory))
+        from counter import AdvancedCounter
+        app = AdvancedCounter()
+        app.save_config = lambda config: None  # Never persist the synthetic counters
+        app.update()
+        metrics = {}
+        for n in COUNTER_SIZES:
+            metrics.update(bench(app, n, 2 if quick else REPEATS))
+        app.on_close()
+    return metrics
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>40}  {value:12.3f}")
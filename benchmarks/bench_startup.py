@@ -0,0 +1,63 @@
+"""Cold start: importing the app and, with a display, building its window and finishing startup.
+
+Every sample is a fresh interpreter against a temporary data directory.
+'constructed' is when the window can be painted; 'ready' is after the
+deferred widgets and crash recovery ran.
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT, has_display, isolated_env
+
+RUNS = 7
+
+IMPORT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import counter
+print(json.dumps({'import': time.perf_counter() - start}))
+"""
+
+WINDOW_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import counter
+imported = time.perf_counter()
+app = counter.AdvancedCounter()
+constructed = time.perf_counter()
+app.update()  # First paint, then the deferred widgets
+ready = time.perf_counter()
+app.on_close()
+print(json.dumps({'import': imported - start, 'constructed': constructed - start, 'ready': ready - start}))
+"""
+
+
+def sample(script, env):
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(quick=False):
+    runs = 3 if quick else RUNS
+    scripts = {'import': IMPORT_SCRIPT}
+    if has_display():
+        scripts['window'] = WINDOW_SCRIPT
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        env = isolated_env(directory)
+        for name, script in scripts.items():
+            samples = [sample(script, env) for _ in range(runs)]
+            for stage in samples[0]:
+                metrics[f"startup_{name}_{stage}_ms"] = statistics.median(s[stage] for s in samples) * 1000
+    return metrics
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>40}  {value:12.3f}")
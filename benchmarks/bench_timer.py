@@ -0,0 +1,77 @@
+"""Timer tick jitter and end-of-run overrun against the target duration.
+
+Each tick waits CounterEngine.next_wakeup_ms(), as the app does with
+after(). Jitter is how far past the second boundary a tick landed, in wall
+time, and overrun is how much later than duration / speed the run finished.
+Runs use time.sleep() headless and Tk's after() when a display is available.
+
+    python benchmarks/bench_timer.py
+"""
+import time
+
+from common import has_display, summarize
+
+from engine import CounterEngine, FINISHED
+from timer import NS_PER_SECOND
+
+SPEEDS = (1.0, 3.0)
+DURATION = 5  # Session seconds per run
+
+
+def drive_sleep(engine, on_tick):
+    while engine.state != FINISHED:
+        time.sleep(engine.next_wakeup_ms() / 1000)
+        on_tick()
+
+
+def drive_tk(engine, on_tick):
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+
+    def tick():
+        on_tick()
+        if engine.state == FINISHED:
+            root.quit()
+        else:
+            root.after(engine.next_wakeup_ms(), tick)
+
+    root.after(engine.next_wakeup_ms(), tick)
+    root.mainloop()
+    root.destroy()
+
+
+def bench(name, drive, speed, duration):
+    engine = CounterEngine(duration=duration)
+    engine.set_speed(speed)
+    lateness = []
+
+    def on_tick():
+        engine.tick()
+        if engine.state != FINISHED:
+            lateness.append(engine.timer.elapsed_ns() % NS_PER_SECOND / NS_PER_SECOND / speed)
+
+    start = time.perf_counter()
+    engine.start()
+    drive(engine, on_tick)
+    overrun = time.perf_counter() - start - duration / speed
+    metrics = summarize(f"timer_{name}_{speed:g}x_jitter", lateness or [0.0])
+    metrics[f"timer_{name}_{speed:g}x_overrun_ms"] = overrun * 1000
+    return metrics
+
+
+def run(quick=False):
+    duration = 2 if quick else DURATION
+    drivers = [('sleep', drive_sleep)]
+    if has_display():
+        drivers.append(('tk', drive_tk))
+    metrics = {}
+    for name, drive in drivers:
+        for speed in SPEEDS:
+            metrics.update(bench(name, drive, speed, duration))
+    return metrics
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>40}  {value:12.3f}")
@@ -0,0 +1,59 @@
+"""Helpers shared by the benchmark modules."""
+import os
+import statistics
+import string
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class FakeKeyEvent:
+    state = 0
+
+    def __init__(self, keysym):
+        self.keysym = keysym
+
+
+def key_names(n):
+    """Return n (at most 2808) distinct key names: A-Z, AA-ZZ, then the same with modifiers."""
+    letters = string.ascii_uppercase
+    names = list(letters)
+    for first in letters:
+        for second in letters:
+            names.append(first + second)
+    for modifier in ('CONTROL', 'ALT', 'CONTROL-ALT'):
+        names.extend(f"{modifier}-{name}" for name in list(names[:26 + 26 * 26]))
+    return names[:n]
+
+
+def counter_config(n):
+    return [{'key': key, 'name': f"Object {key}"} for key in key_names(n)]
+
+
+def summarize(prefix, samples):
+    """Mean, p95 and max of samples (seconds) as '<prefix>_<stat>_ms' metrics."""
+    samples = sorted(samples)
+    return {
+        f"{prefix}_mean_ms": statistics.mean(samples) * 1000,
+        f"{prefix}_p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        f"{prefix}_max_ms": samples[-1] * 1000,
+    }
+
+
+def has_display():
+    """True if Tk can open a window (a desktop session or Xvfb)."""
+    import tkinter as tk
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+
+def isolated_env(directory):
+    """Environment that points the app's per-user data and config directories at directory."""
+    env = dict(os.environ)
+    env.update(HOME=directory, APPDATA=directory, XDG_DATA_HOME=directory, XDG_CONFIG_HOME=directory)
+    return env
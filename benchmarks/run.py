@@ -0,0 +1,105 @@
+"""Run the benchmark suite, write the results as JSON and compare them with a baseline.
+
+    python benchmarks/run.py                    # everything that can run here
+    python benchmarks/run.py --quick            # shorter runs, e.g. in CI
+    python benchmarks/run.py --save-baseline    # store the results as the new baseline
+    xvfb-run python benchmarks/run.py           # include the display benchmarks on a headless box
+
+Metrics ending in _per_s are better when higher, all others when lower.
+The exit status is 1 when a metric regressed by more than --tolerance
+against the baseline.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+from common import has_display
+
+BENCHMARKS = ('engine', 'timer', 'export', 'startup', 'render', 'keypress')
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_TOLERANCE = 0.25  # Relative change tolerated before a metric counts as a regression
+NOISE_FLOOR_MS = 0.05  # Timings below this on both sides are not compared
+
+
+def higher_is_better(name):
+    return name.endswith('_per_s')
+
+
+def compare(metrics, baseline, tolerance):
+    """Return (name, baseline, current, relative change) for every regressed metric."""
+    regressions = []
+    for name, current in metrics.items():
+        before = baseline.get(name)
+        if not before or name.endswith('_max_ms'):  # Single worst samples are too noisy to gate on
+            continue
+        if name.endswith('_ms') and max(before, current) < NOISE_FLOOR_MS:
+            continue
+        change = (current - before) / before
+        if (-change if higher_is_better(name) else change) > tolerance:
+            regressions.append((name, before, current, change))
+    return regressions
+
+
+def run(names, quick):
+    display = has_display()
+    metrics, skipped = {}, []
+    for name in names:
+        module = importlib.import_module(f"bench_{name}")
+        if getattr(module, 'requires_display', False) and not display:
+            skipped.append(name)
+            print(f"{name}: skipped (no display; run under xvfb-run)", file=sys.stderr)
+            continue
+        start = time.perf_counter()
+        metrics.update(module.run(quick=quick))
+        print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'skipped': skipped,
+        'metrics': metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument('--quick', action='store_true', help="shorter runs")
+    parser.add_argument('--output', help="write the results JSON here (default: stdout)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results to --baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    names = args.only.split(',') if args.only else BENCHMARKS
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = run(names, args.quick)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            f.write(text + '\n')
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['metrics']
+    regressions = compare(results['metrics'], baseline, args.tolerance)
+    for name, before, current, change in regressions:
+        print(f"REGRESSION {name}: {before:.4g} -> {current:.4g} ({change:+.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,74 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import json
-import csv
+from tkinter import ttk
+import tkinter.font as tkfont
+import os
+import sys
 import time
-import winsound
-import platform
-
-class AdvancedCounter(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Advanced Counter")
-        self.geometry("800x600")
-        self.configure(padx=20, pady=20)
-        # State management
-        self.counters = []
-        self.key_states = {}
-        self.is_running = False
-        self.is_paused = False
-        self.start_time = 0
-        self.elapsed_time = 0
-        self.timer_speed = 1.0  # Default speed
-        self.target_duration = 900  # Default: 15 minutes
+import threading
+# Rarely used modules (file dialogs, export, ingest server, diagnostics, history) are imported where used to keep startup fast
+from engine import IDLE, RUNNING, PAUSED, FINISHED
+from events import DEFAULT_MEMORY_LIMIT_MB, MB
+from journal import JournalWriter
+from keyinput import InputEngine
+from metrics import Metrics
+from notify import LogNotifier, MultiNotifier, SoundNotifier, StatusBarNotifier, logger
+from paths import sessions_dir
+from persistence import ConfigStore, atomic_write_json, read_config, versioned
+from render import DEFAULT_FPS, RenderScheduler
+from recovery import find_all_interrupted, load_event_history, prune_journals, recover
+from registry import MAX_KEY_BYTES, key_from_event, normalize_key, windowing_system
+from sessions import SessionManager
+from tilegrid import VirtualTileGrid
+
+EXPORT_FILETYPES = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("Parquet files (needs pyarrow)", "*.parquet")]
+BIN_CHOICES = (10, 30, 60, 300)  # Results bin sizes in seconds
+SNAPSHOT_INTERVAL_MS = 5000  # How often a running session is checkpointed for crash recovery
+INGEST_DRAIN_MS = 20  # How often increments from the ingest server are applied, as one batch
+LAG_PROBE_MS = 100  # Interval of the event-loop lag probe while metrics are enabled
+METRICS_EXPORT_MS = 5000  # How often --metrics-file is rewritten
+DEFAULT_CONFIG = {'counters': [], 'duration': 900}  # Default: 15 minutes
+
+
+class SessionView(ttk.Frame):
+    """Controls, counter grid and results of one session; a view of the session's engine."""
+
+    def __init__(self, parent, app, session):
+        super().__init__(parent, padding=10)
+        self.app = app
+        self.session = session
+        self.engine = session.engine
+        self.counters = self.engine.counters
         self.last_key_pressed = None
         self.show_results = False
-        # Load previous config if available
-        self.load_config()
+        self.results_frame = None
+        self.results_tree = None
+        self.pending_bins = {}  # Results row -> (counter result, analysis) whose bin rows are not inserted yet
+        self.bin_seconds = 30  # Default results bin size in seconds
+        self.input = InputEngine(self.counters, metrics=app.metrics)  # Chords, sequences and debounce
         # Create UI elements
         self.create_widgets()
-        self.bind_keys()
-        # Font size adjustment
-        self.font_size = 12  # Default font size
-        self.add_font_size_control()
-        self.update_counters_display()  # Ensure font size is applied
+        # A detached or recovered session may already be mid-run, so reflect the engine as it is
+        self.on_state_change(self.engine.state)
+        self.update_timer_label()
+        if self.engine.state == FINISHED:
+            self.show_results = True
+            self.update_results_display()
+        # The frame is a view of the engine
+        self.subscriptions = [
+            ('increment', self.on_increment),
+            ('counters', self.update_counters_display),
+            ('state', self.on_state_change),
+            ('finished', self.on_finished),
+        ]
+        for event, callback in self.subscriptions:
+            self.engine.subscribe(event, callback)
+
+    def destroy(self):
+        for event, callback in self.subscriptions:
+            self.engine.unsubscribe(event, callback)
+        self.subscriptions = []
+        self.app.renderer.discard(self)
+        super().destroy()
 
     def create_widgets(self):
         # Control panel
@@ -55,10 +92,10 @@ class AdvancedCounter(tk.Tk):
         speed_frame = ttk.Frame(control_frame)
         speed_frame.grid(row=0, column=5, padx=20)
         ttk.Label(speed_frame, text="Speed:").pack(side=tk.LEFT)
+        self.speed_value_label = ttk.Label(speed_frame, text=f"{self.engine.speed:.1f}x")
         self.speed_scale = ttk.Scale(speed_frame, from_=0.1, to=3.0, orient='horizontal', command=self.update_speed)
-        self.speed_scale.set(1.0)  # Default speed
+        self.speed_scale.set(self.engine.speed)
         self.speed_scale.pack(side=tk.LEFT)
-        self.speed_value_label = ttk.Label(speed_frame, text="1.0x")
         self.speed_value_label.pack(side=tk.LEFT, padx=(5, 0))
         # Timer display
         self.timer_label = ttk.Label(control_frame, text="0:00 / 15:00", font=('Helvetica', 14))
@@ -68,9 +105,9 @@ class AdvancedCounter(tk.Tk):
         duration_frame.grid(row=1, column=0, sticky="ew", padx=10)
         ttk.Label(duration_frame, text="Duration (min):").pack(side=tk.LEFT)
         self.duration_entry = ttk.Entry(duration_frame, width=5)
-        self.duration_entry.insert(0, "15")  # Default value
+        self.duration_entry.insert(0, str(int(self.engine.duration // 60)))
         self.duration_entry.pack(side=tk.LEFT)
-        self.duration_entry.bind("<Return>", self.update_duration)  # Corrected event binding
+        self.duration_entry.bind("<Return>", self.update_duration)
         # Reminder label with word wrap
         self.reminder_label = ttk.Label(
             duration_frame,
@@ -79,6 +116,16 @@ class AdvancedCounter(tk.Tk):
             wraplength=110
         )  # Set a wrap length
         self.reminder_label.pack(side=tk.LEFT, padx=(5, 0))
+        # Long-run mode keeps the event history under a memory cap (see events.RollingEventLog)
+        self.long_run_var = tk.BooleanVar(value=bool(self.engine.memory_limit_mb))
+        ttk.Checkbutton(duration_frame, text="Long run, memory cap (MB):", variable=self.long_run_var,
+                        command=self.update_memory_limit).pack(side=tk.LEFT, padx=(10, 0))
+        self.memory_entry = ttk.Entry(duration_frame, width=5)
+        self.memory_entry.insert(0, f"{self.engine.memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB:g}")
+        self.memory_entry.pack(side=tk.LEFT, padx=5)
+        self.memory_entry.bind("<Return>", self.update_memory_limit)
+        self.memory_label = ttk.Label(duration_frame)
+        self.memory_label.pack(side=tk.LEFT, padx=5)
         # Configuration controls
         config_frame = ttk.Frame(self)
         config_frame.grid(row=2, column=0, sticky="ew", pady=10)
@@ -87,213 +134,167 @@ class AdvancedCounter(tk.Tk):
         # Add object controls
         add_frame = ttk.Frame(self)
         add_frame.grid(row=3, column=0, sticky="ew", pady=10)
-        self.key_entry = ttk.Entry(add_frame, width=3)
+        self.key_entry = ttk.Entry(add_frame, width=10)
         self.key_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(add_frame, text="Key (A-Z)").pack(side=tk.LEFT)
+        ttk.Label(add_frame, text="Key (A-Z, 0-9, F1, Control-A, G G)").pack(side=tk.LEFT)
         # Instructional label
         ttk.Label(add_frame, text="Object Label/Name:").pack(side=tk.LEFT, padx=(5, 0))
         self.name_entry = ttk.Entry(add_frame)
         self.name_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        # Optional debounce window against switch chatter
+        ttk.Label(add_frame, text="Debounce (ms):").pack(side=tk.LEFT)
+        self.debounce_entry = ttk.Entry(add_frame, width=5)
+        self.debounce_entry.insert(0, "0")
+        self.debounce_entry.pack(side=tk.LEFT, padx=5)
         ttk.Button(add_frame, text="Add Object", command=self.add_counter).pack(side=tk.LEFT, padx=5)
-        # Scrollable frame for counters
-        self.counters_frame = ttk.Frame(self)
-        self.counters_frame.grid(row=4, column=0, sticky="nsew")
-        
-        # Create a canvas for scrolling
-        self.canvas = tk.Canvas(self.counters_frame)
-        self.scrollbar = ttk.Scrollbar(self.counters_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        # Bind mouse wheel event for scrolling
-        if platform.system() == "Linux":
-            self.canvas.bind("<Button-4>", self.on_mouse_wheel)  # Scroll up
-            self.canvas.bind("<Button-5>", self.on_mouse_wheel)  # Scroll down
-        else:
-            self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)  # Windows and macOS
-        # Ensure focus on the canvas
-        self.canvas.bind("<Button-1>", lambda event: self.canvas.focus_set())
-        # Configure grid weights for responsive layout
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(4, weight=1)  # Allow counters frame to expand
-        # Update the timer display initially
-        self.timer_label.config(text=f"0:00 / {self.format_time(self.target_duration)}")
-        # Scrollable frame for counters
-        self.counters_frame = ttk.Frame(self)
-        self.counters_frame.grid(row=4, column=0, sticky="nsew")
-        
-        # Create a canvas for scrolling
-        self.canvas = tk.Canvas(self.counters_frame)
-        self.scrollbar = ttk.Scrollbar(self.counters_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        # Bind the scrollable frame to update the canvas scrollregion
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        # Link the scrollbar to the canvas
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        # Pack the canvas and scrollbar
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Bind mouse wheel events for scrolling
-        if platform.system() == "Linux":
-            self.canvas.bind("<Button-4>", self.on_mouse_wheel)  # Scroll up
-            self.canvas.bind("<Button-5>", self.on_mouse_wheel)  # Scroll down
-        else:
-            self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)  # Windows and macOS
-        
-        # Ensure focus on the canvas for mouse wheel events
-        self.canvas.bind("<Button-1>", lambda event: self.canvas.focus_set())
-        
+        # Scrollable, virtualized grid of counter tiles
+        self.counter_grid = VirtualTileGrid(
+            self, self.counters, (self.app.name_font, self.app.key_font, self.app.count_font), self.remove_counter)
+        self.counter_grid.grid(row=4, column=0, sticky="nsew")
         # Configure grid weights for responsive layout
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(4, weight=1)  # Allow counters frame to expand
 
-    def on_mouse_wheel(self, event):
-        """Handle mouse wheel scrolling for the canvas."""
-        if platform.system() == "Windows":
-            # On Windows, the delta value is usually larger (e.g., 120)
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        elif platform.system() == "Darwin":  # macOS
-            # On macOS, the delta value is smaller (e.g., 1 or -1)
-            self.canvas.yview_scroll(-1 * event.delta, "units")
-        else:  # Linux
-            # On Linux, Button-4 is scroll up, Button-5 is scroll down
-            if event.num == 4:
-                self.canvas.yview_scroll(-1, "units")
-            elif event.num == 5:
-                self.canvas.yview_scroll(1, "units")
-
     def update_counters_display(self):
-        """Redesign the layout of counters in a grid format with Remove buttons."""
-        # Clear all existing widgets in the scrollable_frame
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        # Loop through each counter and create its UI representation
-        for idx, counter in enumerate(self.counters):
-            # Create a frame for each counter
-            frame = ttk.Frame(self.scrollable_frame, relief="solid", padding=10)
-            frame.grid(row=idx // 3, column=idx % 3, padx=5, pady=5, sticky="nsew")
-
-            # Object Name (Bold, size based on self.font_size)
-            ttk.Label(
-                frame,
-                text=counter['name'],
-                font=('Helvetica', self.font_size, 'bold')
-            ).pack()
-
-            # Key Instruction (Regular font, slightly smaller than self.font_size)
-            ttk.Label(
-                frame,
-                text=f"Press '{counter['key']}'",
-                font=('Helvetica', max(self.font_size - 2, 8))  # Ensure minimum size of 8
-            ).pack()
-
-            # Count (Bold, larger than self.font_size)
-            ttk.Label(
-                frame,
-                text=str(counter['count']),
-                font=('Helvetica', self.font_size + 12, 'bold')  # Larger font for count
-            ).pack()
-
-            # Remove Button (Underneath the labels)
-            remove_btn = ttk.Button(frame, text="Remove", command=lambda c=counter: self.remove_counter(c))
-            remove_btn.pack(pady=(5, 0))  # Add padding above the button
-
-        # Update the scrollregion of the canvas
-        self.scrollable_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        """Pick up added or removed counters; only the tiles in view are (re)built."""
+        self.input.compile()
+        self.counter_grid.set_counters()
 
-    def bind_keys(self):
-        self.bind_all("<KeyPress>", self.handle_key_press)
-        self.bind_all("<KeyRelease>", self.handle_key_release)
-        self.duration_entry.bind("<Return>", self.update_duration)
+    def update_counter_tile(self, key):
+        """Refresh the count label of a single counter without touching the rest of the grid."""
+        self.counter_grid.update_count(key)
+
+    def refresh_counter_tiles(self):
+        """Refresh every count label in place, e.g. after a reset."""
+        self.counter_grid.update_counts()
 
     def handle_key_press(self, event):
-        if not self.is_running or self.is_paused or event.keysym.upper() in self.key_states:
+        """Count a keypress routed here by the app, which already filtered out auto-repeat."""
+        if self.engine.state != RUNNING:
             return
-        key = event.keysym.upper()
-        self.key_states[key] = True
+        key = self.input.press(key_from_event(event, self.app.windowing_system))
+        if key is None:
+            return  # Unbound, the start of a sequence, or a bounce
         self.last_key_pressed = key
-        for counter in self.counters:
-            if counter['key'] == key:
-                counter['count'] += 1
-                self.update_counters_display()
-                break
-
-    def handle_key_release(self, event):
-        key = event.keysym.upper()
-        if key in self.key_states:
-            del self.key_states[key]
-
-    def start_timer(self):
-        if not self.is_running:
-            self.is_running = True
-            self.start_btn.config(state=tk.DISABLED)
-            self.stop_btn.config(state=tk.NORMAL)
-            self.pause_btn.config(state=tk.NORMAL)
-            self.resume_btn.config(state=tk.DISABLED)
-            self.elapsed_time = 0  # Reset elapsed time for new start
-            # Set target_duration from entry
+        self.engine.increment(key)  # The tile is refreshed by on_increment
+
+    def on_increment(self, key, slot):
+        self.app.renderer.mark(self.update_counter_tile, key)  # Drawn with the next frame
+
+    def on_state_change(self, state):
+        """Enable the timer buttons that make sense in the new engine state."""
+        active = state in (RUNNING, PAUSED)
+        self.start_btn.config(state=tk.DISABLED if active else tk.NORMAL)
+        self.stop_btn.config(state=tk.NORMAL if active else tk.DISABLED)
+        self.pause_btn.config(state=tk.NORMAL if state == RUNNING else tk.DISABLED)
+        self.resume_btn.config(state=tk.NORMAL if state == PAUSED else tk.DISABLED)
+        if state == PAUSED:
+            self.engine.checkpoint()
+
+    def recover(self, path):
+        """Restore this session from a crash snapshot and its journal tail, paused."""
+        snapshot = recover(self.engine, path)
+        journal_path = snapshot['journal']
+        self.engine.attach_journal(JournalWriter(journal_path, metrics=self.app.metrics))
+        self.sync_settings()
+        self.update_timer_label()
+        # Counts are already exact; the per-event history is only needed for results, so load it in the background
+        index = dict(self.counters.index)
+        history = self.engine.new_event_log()
+        result = {}
+
+        def load():
             try:
-                minutes = int(self.duration_entry.get())
-                self.target_duration = minutes * 60  # Convert to seconds
-            except ValueError:
-                messagebox.showerror("Invalid Input", "Please enter a valid number for duration.")
-                self.is_running = False
-                return
-            self.start_time = time.time() - self.elapsed_time
-            self.update_timer()
+                result['history'] = load_event_history(journal_path, index, snapshot['events'], history)
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=load, name="history-loader", daemon=True)
+        thread.start()
+        self.after(50, self.merge_recovered_history, journal_path, thread, result)
+
+    def merge_recovered_history(self, journal_path, thread, result):
+        if not self.winfo_exists():
+            return  # The session was closed meanwhile
+        if thread.is_alive():
+            self.after(50, self.merge_recovered_history, journal_path, thread, result)
+        elif 'error' in result:
+            self.show_notification(
+                f"{self.session.name}: results will miss the presses before the crash ({result['error']})", "error")
         else:
-            messagebox.showerror("Error", "Timer is already running.")
-
-    def stop_timer(self):
-        """Stop the timer and reset the counter."""
-        self.is_running = False
-        self.elapsed_time = 0
-        self.start_btn.config(state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-        self.pause_btn.config(state=tk.DISABLED)
-        self.resume_btn.config(state=tk.DISABLED)
-        self.timer_label.config(text=f"0:00 / {self.format_time(self.target_duration)}")
+            journal = self.engine.journal
+            if journal is not None and journal.path == journal_path:  # Still the recovered run
+                self.engine.merge_event_history(result['history'])
+
+    def on_finished(self, results):
+        """Show the end of the run, whether a tick, a keypress or an ingest batch found the time up."""
+        self.update_timer_label()
+        if self.engine.elapsed_time >= self.engine.duration:
+            self.show_notification(f"{self.session.name}: Timer completed!", "info")
         self.show_results = True
         self.update_results_display()
+        self.app.record_history(self)
+
+    def start_timer(self):
+        if self.engine.state in (RUNNING, PAUSED):
+            self.show_notification("Timer is already running.", "error")
+            return
+        # Set target duration from entry
+        try:
+            minutes = int(self.duration_entry.get())
+        except ValueError:
+            self.show_notification("Please enter a valid number for duration.", "error")
+            return
+        self.engine.start(minutes * 60)  # Convert to seconds
+        self.input.reset()
+        self.engine.attach_journal(JournalWriter(self.new_journal_path(), metrics=self.app.metrics))
+        self.app.schedule_tick()
+
+    def new_journal_path(self):
+        """Return a fresh journal file name in the per-user sessions directory."""
+        return os.path.join(sessions_dir(), f"{time.strftime('%Y%m%d-%H%M%S')}-s{self.session.id}.journal")
+
+    def stop_timer(self):
+        """Stop the timer and show the results."""
+        self.engine.stop()
+        self.timer_label.config(text=f"0:00 / {self.format_time(self.engine.duration)}")
+        self.app.schedule_tick()
 
     def pause_timer(self):
-        if self.is_running and not self.is_paused:
-            self.is_paused = True
-            self.pause_btn.config(state=tk.DISABLED)
-            self.resume_btn.config(state=tk.NORMAL)
-            self.start_btn.config(state=tk.DISABLED)  # Disable start button while paused
+        self.engine.pause()
+        self.app.schedule_tick()
 
     def resume_timer(self):
-        if self.is_paused:
-            self.is_paused = False
-            self.resume_btn.config(state=tk.DISABLED)
-            self.pause_btn.config(state=tk.NORMAL)
-            self.start_btn.config(state=tk.DISABLED)  # Disable start button while running
-            self.start_time = time.time() - self.elapsed_time  # Update start time to continue from current elapsed time
-            self.update_timer()
-
-    def update_timer(self):
-        if self.is_running and not self.is_paused:
-            self.elapsed_time = (time.time() - self.start_time) * self.timer_speed
-            if self.elapsed_time >= self.target_duration:
-                self.is_running = False
-                self.show_results = True
-                self.show_notification("Timer completed!", "info")
-                self.update_results_display()
-                self.start_btn.config(state=tk.NORMAL)  # Enable start button after completion
-                self.stop_btn.config(state=tk.DISABLED)
-            self.timer_label.config(text=f"{self.format_time(self.elapsed_time)} / {self.format_time(self.target_duration)}")
-            self.after(100, self.update_timer)
+        self.engine.resume()
+        self.app.schedule_tick()
+
+    def update_timer_label(self):
+        self.timer_label.config(text=f"{self.format_time(self.engine.elapsed_time)} / {self.format_time(self.engine.duration)}")
+        self.update_memory_label()
+
+    def update_memory_label(self):
+        """Show how much memory the event history of the run takes, against the cap in a long run."""
+        events = self.engine.events
+        used = f"Events: {events.memory_bytes() / MB:.1f}"
+        limit = getattr(events, 'memory_limit', None)
+        self.memory_label.config(text=f"{used} / {limit / MB:g} MB" if limit else f"{used} MB")
+
+    def update_memory_limit(self, event=None):
+        """Turn long-run mode on or off, or change its cap; takes effect at the next start."""
+        if self.long_run_var.get():
+            try:
+                limit = float(self.memory_entry.get())
+                if limit <= 0:
+                    raise ValueError
+            except ValueError:
+                self.show_notification("Please enter a positive number of megabytes.", "error")
+                return
+            self.engine.memory_limit_mb = limit
+        else:
+            self.engine.memory_limit_mb = None
+        if self.engine.state in (RUNNING, PAUSED):
+            self.show_notification("The memory cap applies from the next start.", "info")
+        self.save_config()
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)
@@ -304,170 +305,542 @@ class AdvancedCounter(tk.Tk):
         """Update the timer display based on the duration entry."""
         try:
             minutes = int(self.duration_entry.get())
-            self.target_duration = minutes * 60  # Convert to seconds
-            self.timer_label.config(text=f"0:00 / {self.format_time(self.target_duration)}")
+            self.engine.duration = minutes * 60  # Convert to seconds
+            self.timer_label.config(text=f"0:00 / {self.format_time(self.engine.duration)}")
         except ValueError:
             pass  # Ignore invalid input
 
+    def sync_settings(self):
+        """Show the engine's speed, duration and long-run cap in the controls, e.g. after a recovery."""
+        self.speed_scale.set(self.engine.speed)
+        self.speed_value_label.config(text=f"{self.engine.speed:.1f}x")
+        self.duration_entry.delete(0, tk.END)
+        self.duration_entry.insert(0, str(int(self.engine.duration // 60)))
+        self.long_run_var.set(bool(self.engine.memory_limit_mb))
+        if self.engine.memory_limit_mb:
+            self.memory_entry.delete(0, tk.END)
+            self.memory_entry.insert(0, f"{self.engine.memory_limit_mb:g}")
+
     def update_speed(self, value):
         """Update the timer speed based on the scale value."""
-        self.timer_speed = float(value)
-        self.speed_value_label.config(text=f"{self.timer_speed:.1f}x")  # Update displayed speed
+        self.engine.set_speed(float(value))
+        self.speed_value_label.config(text=f"{self.engine.speed:.1f}x")  # Update displayed speed
+        if self.engine.state == RUNNING:
+            self.app.schedule_tick()  # The next second boundary moved with the speed
 
     def add_counter(self):
-        key = self.key_entry.get().upper()
+        key = normalize_key(self.key_entry.get())
         name = self.name_entry.get()
         if not key or not name:
             self.show_notification("Both key and name are required!", "warning")
             return
-        if any(c['key'] == key for c in self.counters):
+        if key in self.counters:
             self.show_notification("Key already exists!", "warning")
             return
-        # Create a new counter object and add it to the list
-        counter = {'key': key, 'name': name, 'count': 0}
-        self.counters.append(counter)
+        if len(key.encode('utf-8')) > MAX_KEY_BYTES:
+            self.show_notification(f"Keys can be at most {MAX_KEY_BYTES} bytes long.", "warning")
+            return
+        try:
+            debounce_ms = int(self.debounce_entry.get() or 0)
+        except ValueError:
+            debounce_ms = -1
+        if debounce_ms < 0:
+            self.show_notification("Debounce must be a whole number of milliseconds.", "warning")
+            return
+        # Register the counter; the grid and input table are rebuilt by the engine's 'counters' event
+        self.engine.add_counter(key, name, debounce_ms)
         self.key_entry.delete(0, tk.END)
         self.name_entry.delete(0, tk.END)
-        self.update_counters_display()
         self.save_config()
 
-    def remove_counter(self, counter):
-        """Remove a counter from the list."""
-        self.counters.remove(counter)
-        self.update_counters_display()
+    def remove_counter(self, key):
+        """Remove the counter bound to key."""
+        self.engine.remove_counter(key)
         self.save_config()
 
-    def update_counters_display(self):
-        """Redesign the layout of counters in a grid format with Remove buttons."""
-        # Clear all existing widgets in the counters_frame
-        for widget in self.counters_frame.winfo_children():
-            widget.destroy()
-
-        # Loop through each counter and create its UI representation
-        for idx, counter in enumerate(self.counters):
-            # Create a frame for each counter
-            frame = ttk.Frame(self.counters_frame, relief="solid", padding=10)
-            frame.grid(row=idx // 3, column=idx % 3, padx=5, pady=5, sticky="nsew")
-
-            # Object Name (Bold, size 12)
-            ttk.Label(frame, text=counter['name'], font=('Helvetica', 12, 'bold')).pack()
-
-            # Key Instruction (Regular font)
-            ttk.Label(frame, text=f"Press '{counter['key']}'").pack()
-
-            # Count (Bold, size 24)
-            ttk.Label(frame, text=str(counter['count']), font=('Helvetica', 24, 'bold')).pack()
-
-            # Remove Button (Underneath the labels)
-            remove_btn = ttk.Button(frame, text="Remove", command=lambda c=counter: self.remove_counter(c))
-            remove_btn.pack(pady=(5, 0))  # Add padding above the button
-
-        # Configure column weights to ensure proper resizing
-        self.counters_frame.grid_columnconfigure(0, weight=1)
-        self.counters_frame.grid_columnconfigure(1, weight=1)
-        self.counters_frame.grid_columnconfigure(2, weight=1)
-
-        # Update the layout and scroll region if needed
-        self.counters_frame.update_idletasks()
-
     def update_results_display(self):
         if self.show_results:
+            if self.results_frame is not None:
+                self.results_frame.destroy()
             self.results_frame = ttk.Frame(self)
-            self.results_frame.pack(fill=tk.BOTH, expand=True)
-            tree = ttk.Treeview(self.results_frame, columns=('name', 'count'), show='headings')
-            tree.heading('name', text='Object Name')
-            tree.heading('count', text='Total Count')
-            for counter in self.counters:
-                tree.insert('', tk.END, values=(counter['name'], counter['count']))
-            tree.pack(fill=tk.BOTH, expand=True)
+            self.results_frame.grid(row=5, column=0, sticky="nsew")
+            # Bin size for the per-interval breakdown
+            bin_frame = ttk.Frame(self.results_frame)
+            bin_frame.pack(fill=tk.X)
+            ttk.Label(bin_frame, text="Bin (s):").pack(side=tk.LEFT)
+            self.bin_combo = ttk.Combobox(bin_frame, values=BIN_CHOICES, width=5, state="readonly")
+            self.bin_combo.set(self.bin_seconds)
+            self.bin_combo.bind("<<ComboboxSelected>>", self.update_bin_seconds)
+            self.bin_combo.pack(side=tk.LEFT, padx=5)
+            self.results_tree = ttk.Treeview(
+                self.results_frame,
+                columns=('name', 'count', 'rate', 'mean', 'median'),
+                show='headings tree'
+            )
+            self.results_tree.column('#0', width=30, stretch=False)  # Expander for the per-bin rows
+            self.results_tree.heading('name', text='Object Name')
+            self.results_tree.heading('count', text='Total Count')
+            self.results_tree.heading('rate', text='Rate (/min)')
+            self.results_tree.heading('mean', text='Mean Interval (s)')
+            self.results_tree.heading('median', text='Median Interval (s)')
+            self.results_tree.bind('<<TreeviewOpen>>', self.open_result_row)
+            # Totals are shown right away; the analytics fill in once computed
+            for result in self.engine.results():
+                self.results_tree.insert('', tk.END, values=(result['name'], result['count'], '', '', ''))
+            self.results_tree.pack(fill=tk.BOTH, expand=True)
             # Option to save results
-            save_button = ttk.Button(self.results_frame, text="Save Results as CSV", command=self.export_csv)
-            save_button.pack(pady=10)
+            export_frame = ttk.Frame(self.results_frame)
+            export_frame.pack(pady=10)
+            save_button = ttk.Button(export_frame, text="Save Results as CSV", command=self.export_csv)
+            save_button.pack(side=tk.LEFT, padx=5)
+            ttk.Button(export_frame, text="Export Bins...", command=lambda: self.export_results('bins')).pack(side=tk.LEFT, padx=5)
+            ttk.Button(export_frame, text="Export Events...", command=lambda: self.export_results('events')).pack(side=tk.LEFT, padx=5)
+            self.export_progress = ttk.Progressbar(export_frame, length=150, maximum=1.0)
+            self.export_progress.pack(side=tk.LEFT, padx=5)
+            self.start_results_analysis()
+
+    def update_bin_seconds(self, event=None):
+        self.bin_seconds = int(self.bin_combo.get())
+        self.update_results_display()
+
+    def start_results_analysis(self):
+        """Compute rates and per-bin counts on a worker thread so large sessions never block the window."""
+        try:
+            from analytics import analyze, event_arrays, rollup_arrays
+        except ImportError:
+            return  # NumPy is not installed; the totals are all we can show
+        # Copy the events here: the worker must not hold a buffer on arrays the UI thread appends to
+        times, slots = event_arrays(self.engine.events)
+        rollup = rollup_arrays(self.engine.events)
+        counters = [(key, self.counters.names[slot], slot) for key, slot in self.counters.index.items()]
+        elapsed = self.engine.elapsed_time
+        bin_seconds = self.bin_seconds
+        tree = self.results_tree
+        done = []
+        threading.Thread(
+            target=lambda: done.append(analyze(times, slots, counters, elapsed, bin_seconds, rollup)),
+            name="results-analysis",
+            daemon=True,
+        ).start()
+        self.after(50, self.show_results_analysis, tree, done)
+
+    def show_results_analysis(self, tree, done):
+        if not done:
+            self.after(50, self.show_results_analysis, tree, done)
+            return
+        if tree is not self.results_tree or not tree.winfo_exists():
+            return  # The results view was rebuilt or closed meanwhile
+        analysis = done[0]
+        tree.delete(*tree.get_children())
+        self.pending_bins = {}
+        for result in analysis['counters']:
+            row = tree.insert('', tk.END, values=(
+                result['name'],
+                result['count'],
+                f"{result['rate_per_min']:.1f}",
+                '' if result['interval_mean'] is None else f"{result['interval_mean']:.2f}",
+                '' if result['interval_median'] is None else f"{result['interval_median']:.2f}",
+            ))
+            if len(analysis['bin_starts']):
+                tree.insert(row, tk.END)  # Placeholder so the row shows an expander
+                self.pending_bins[row] = (result, analysis)
+
+    def open_result_row(self, event):
+        """Insert the per-bin rows of a counter the first time its row is expanded."""
+        tree = event.widget
+        row = tree.focus()
+        pending = self.pending_bins.pop(row, None)
+        if pending is None:
+            return
+        result, analysis = pending
+        bin_seconds = analysis['bin_seconds']
+        tree.delete(*tree.get_children(row))
+        for start, count, total in zip(analysis['bin_starts'], result['bins'], result['cumulative']):
+            tree.insert(row, tk.END, values=(
+                f"{self.format_time(start)}-{self.format_time(start + bin_seconds)}",
+                f"{count} (total {total})",
+                f"{count * 60 / bin_seconds:.1f}",
+                '',
+                '',
+            ))
 
     def export_csv(self):
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(defaultextension=".csv")
         if filename:
-            with open(filename, 'w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(['Object Name', 'Total Count'])
-                for counter in self.counters:
-                    writer.writerow([counter['name'], counter['count']])
+            self.start_export('totals', filename)
+
+    def export_results(self, dataset):
+        """Ask for a file and export dataset ('totals', 'bins' or 'events') in the format of its extension."""
+        from tkinter import filedialog
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=EXPORT_FILETYPES)
+        if filename:
+            self.start_export(dataset, filename)
+
+    def start_export(self, dataset, filename):
+        """Stream the export on a worker thread; the progress bar is polled from the event loop."""
+        from export import ExportSource, ExportTask
+        task = ExportTask(ExportSource(self.engine, self.bin_seconds), dataset, filename)
+        self.after(100, self.poll_export, task)
+
+    def poll_export(self, task):
+        progress = getattr(self, 'export_progress', None)
+        if progress is not None and progress.winfo_exists():
+            progress['value'] = task.fraction
+        if not task.done:
+            self.after(100, self.poll_export, task)
+        elif task.error is not None:
+            self.show_notification(f"Failed to export {task.path}: {task.error}", "error")
+        else:
+            self.show_notification(f"Exported {task.path}", "info")
 
     def reset_all(self):
-        self.is_running = False
-        self.elapsed_time = 0
+        self.engine.reset()
         self.show_results = False
-        self.start_btn.config(text="Start", state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-        self.pause_btn.config(state=tk.DISABLED)
-        self.resume_btn.config(state=tk.DISABLED)
-        self.timer_label.config(text=f"0:00 / {self.format_time(self.target_duration)}")
-        for counter in self.counters:
-            counter['count'] = 0
-        self.update_counters_display()
-        if hasattr(self, 'results_frame'):  # Check if results_frame exists before destroying it
+        self.timer_label.config(text=f"0:00 / {self.format_time(self.engine.duration)}")
+        self.refresh_counter_tiles()
+        if self.results_frame is not None:  # Check if results_frame exists before destroying it
             self.results_frame.destroy()
+            self.results_frame = None
+            self.results_tree = None
+        self.app.schedule_tick()
 
     def export_config(self):
-        config = {
-            'counters': [{'key': c['key'], 'name': c['name']} for c in self.counters],
-            'duration': self.target_duration
-        }
+        from tkinter import filedialog
+        config = versioned(self.engine.to_config())
         filename = filedialog.asksaveasfilename(defaultextension=".json")
         if filename:
-            with open(filename, 'w') as f:
-                json.dump(config, f)
+            atomic_write_json(filename, config)
 
     def import_config(self):
+        from tkinter import filedialog
         filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
         if filename:
             try:
-                with open(filename) as f:
-                    config = json.load(f)
-                    self.counters = [{'key': c['key'], 'name': c['name'], 'count': 0} for c in config.get('counters', [])]
-                    self.target_duration = config.get('duration', 900)
-                    self.update_counters_display()
-                    self.timer_label.config(text=f"0:00 / {self.format_time(self.target_duration)}")  # Update display
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load config: {str(e)}")
+                config = read_config(filename)  # Migrated to the current schema and validated
+            except (OSError, ValueError) as e:
+                self.show_notification(f"Failed to load config: {str(e)}", "error")
+                return
+            self.engine.load_counters(config['counters'])
+            self.engine.duration = config['duration']
+            self.engine.memory_limit_mb = config.get('memory_limit_mb')
+            self.sync_settings()
+            self.timer_label.config(text=f"0:00 / {self.format_time(self.engine.duration)}")  # Update display
+
+    def save_config(self):
+        self.app.save_config(self.engine.to_config())
+
+    def show_notification(self, message, type_="info"):
+        self.app.show_notification(f"{self.session.name}: {message}", type_)
+
+
+class AdvancedCounter(tk.Tk):
+    """Main window; hosts any number of sessions as tabs or detached windows."""
+
+    def __init__(self, ingest=None, fps=DEFAULT_FPS, metrics=False, metrics_path=None):
+        started = time.perf_counter()
+        super().__init__()
+        self.title("Advanced Counter")
+        self.geometry("800x600")
+        self.configure(padx=20, pady=20)
+        self.windowing_system = windowing_system(self)  # What the modifier bits of key events mean
+        # State management; each session counts and times in its own engine
+        self.manager = SessionManager()
+        self.views = {}  # session id -> SessionView, in a tab or a detached window
+        self.detached = {}  # session id -> Toplevel holding its view
+        self.key_states = {}
+        self._tick_job = None
+        self.ingest = ingest  # Optional started ingest.IngestServer feeding the selected session
+        # Opt-in instrumentation; a metrics file implies it
+        self.metrics = Metrics()
+        self.metrics_path = metrics_path
+        self.diagnostics = None
+        self.history = None  # history.HistoryStore, opened when first needed
+        self.history_panel = None
+        self.renderer = RenderScheduler(self, fps, metrics=self.metrics)  # Widget updates are coalesced to at most fps per second
+        # Font size adjustment; all tiles share these named fonts so restyling needs no rebuild
+        self.font_size = 12  # Default font size
+        self.name_font = tkfont.Font(self, family='Helvetica', weight='bold')
+        self.key_font = tkfont.Font(self, family='Helvetica')
+        self.count_font = tkfont.Font(self, family='Helvetica', weight='bold')
+        self.apply_font_size()
+        # Load previous config if available; new sessions start from it
+        self.config_store = ConfigStore()
+        self.load_config()
+        # Create the controls and counter grid first; the rest is built once the window is painted
+        self.create_widgets()
+        self.bind_keys()
+        self.add_status_bar()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup_times = {'constructed': time.perf_counter() - started}  # Seconds since __init__ began
+        self.after_idle(self.finish_startup, started)
+        self.after(SNAPSHOT_INTERVAL_MS, self.checkpoint_sessions)
+        if self.ingest is not None:
+            self.after(INGEST_DRAIN_MS, self.drain_ingest)
+        if metrics or metrics_path is not None:
+            self.enable_metrics()
+        if metrics_path is not None:
+            self.after(METRICS_EXPORT_MS, self.export_metrics)
+
+    def create_widgets(self):
+        # Session controls
+        session_frame = ttk.Frame(self)
+        session_frame.grid(row=0, column=0, sticky="ew")
+        ttk.Button(session_frame, text="New Session", command=self.new_session).pack(side=tk.LEFT, padx=5)
+        ttk.Button(session_frame, text="Close Session", command=self.close_current_session).pack(side=tk.LEFT, padx=5)
+        ttk.Button(session_frame, text="Detach", command=self.detach_current_session).pack(side=tk.LEFT, padx=5)
+        ttk.Button(session_frame, text="Diagnostics", command=self.toggle_diagnostics).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(session_frame, text="History", command=self.toggle_history).pack(side=tk.RIGHT, padx=5)
+        # One tab per attached session
+        self.notebook = ttk.Notebook(self)
+        self.notebook.grid(row=1, column=0, sticky="nsew")
+        self.new_session()
+        # Configure grid weights for responsive layout
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)  # Allow the sessions to expand
+
+    def finish_startup(self, started):
+        """Build what the first paint does not need, then pick up sessions interrupted by a crash."""
+        self.add_font_size_control()
+        self.recover_interrupted_sessions()
+        threading.Thread(target=prune_journals, args=(sessions_dir(),), name="journal-pruner", daemon=True).start()
+        self.startup_times['ready'] = time.perf_counter() - started
+        self.metrics.set('startup_seconds', "Time from launch until the window was fully built", self.startup_times['ready'])
+
+    def new_session(self):
+        session = self.manager.create(config=self.default_config)
+        return self.show_session(session)
+
+    def show_session(self, session):
+        """Build a view of session in a new tab and select it."""
+        view = SessionView(self.notebook, self, session)
+        self.views[session.id] = view
+        self.notebook.add(view, text=session.name)
+        self.notebook.select(view)
+        return view
+
+    def current_view(self):
+        selected = self.notebook.select()
+        return self.nametowidget(selected) if selected else None
+
+    def close_current_session(self):
+        view = self.current_view()
+        if view is not None:
+            self.close_session(view.session.id)
+
+    def close_session(self, session_id):
+        """Stop the session, flush its journal and drop its view."""
+        self.views.pop(session_id).destroy()
+        window = self.detached.pop(session_id, None)
+        if window is not None:
+            window.destroy()
+        self.manager.close(session_id)
+        self.schedule_tick()
+
+    def detach_current_session(self):
+        """Move the selected session into its own window; Tk cannot reparent, so the view is rebuilt."""
+        view = self.current_view()
+        if view is None:
+            return
+        session = view.session
+        view.destroy()
+        window = tk.Toplevel(self)
+        window.title(session.name)
+        window.protocol("WM_DELETE_WINDOW", lambda: self.attach_session(session.id))
+        view = SessionView(window, self, session)
+        view.pack(fill=tk.BOTH, expand=True)
+        self.views[session.id] = view
+        self.detached[session.id] = window
+
+    def attach_session(self, session_id):
+        """Move a detached session back into a tab."""
+        self.views[session_id].destroy()
+        self.detached.pop(session_id).destroy()
+        self.show_session(self.manager.get(session_id))
+
+    def view_for_event(self, event):
+        """The session a key event belongs to: the detached window it was typed in, else the selected tab."""
+        widget = getattr(event, 'widget', None)
+        if isinstance(widget, tk.Misc):
+            toplevel = widget.winfo_toplevel()
+            for session_id, window in self.detached.items():
+                if window is toplevel:
+                    return self.views[session_id]
+        return self.current_view()
+
+    def bind_keys(self):
+        self.bind_all("<KeyPress>", self.handle_key_press)
+        self.bind_all("<KeyRelease>", self.handle_key_release)
+
+    def handle_key_press(self, event):
+        if event.keysym.upper() in self.key_states:
+            return
+        self.key_states[event.keysym.upper()] = True  # Auto-repeat guard, cleared on release
+        view = self.view_for_event(event)
+        if view is None:
+            return
+        if self.metrics.enabled:
+            start = time.perf_counter()
+            view.handle_key_press(event)
+            self.metrics.observe('keypress_seconds', time.perf_counter() - start)
+        else:
+            view.handle_key_press(event)
+
+    def handle_key_release(self, event):
+        key = event.keysym.upper()
+        if key in self.key_states:
+            del self.key_states[key]
+
+    def drain_ingest(self):
+        """Apply the increments received from remote clients since the last drain as one batch."""
+        if self.metrics.enabled:
+            self.metrics.set('ingest_queue_keys', "Presses waiting in the ingest queue", self.ingest.pending)
+            self.metrics.set('ingest_dropped_events', "UDP events dropped on a full ingest queue", self.ingest.dropped)
+        keys = self.ingest.drain()
+        if keys:
+            view = self.current_view()
+            if view is not None:
+                view.engine.increment_many(keys)
+        # A backlog is applied in DRAIN_KEYS steps with the event loop running in between
+        self.after(1 if self.ingest.pending else INGEST_DRAIN_MS, self.drain_ingest)
+
+    def enable_metrics(self):
+        """Start collecting metrics; until then instrumented code paths only test a flag."""
+        if not self.metrics.enabled:
+            self.metrics.enabled = True
+            self.after(LAG_PROBE_MS, self.probe_event_loop, time.perf_counter() + LAG_PROBE_MS / 1000)
+
+    def probe_event_loop(self, due):
+        """Measure how late after() callbacks run, i.e. how long the event loop was busy."""
+        self.metrics.observe('event_loop_lag_seconds', max(0.0, time.perf_counter() - due))
+        self.after(LAG_PROBE_MS, self.probe_event_loop, time.perf_counter() + LAG_PROBE_MS / 1000)
+
+    def toggle_diagnostics(self):
+        """Show or hide the diagnostics panel; opening it turns metrics collection on."""
+        if self.diagnostics is not None:
+            self.diagnostics.close()
+            return
+        from diagnostics import DiagnosticsPanel
+        self.enable_metrics()
+        self.diagnostics = DiagnosticsPanel(self, self.metrics, on_close=self.on_diagnostics_closed)
+
+    def on_diagnostics_closed(self):
+        self.diagnostics = None
+
+    def history_store(self):
+        """The history database, opened on first use; None (after a notification) if it cannot be."""
+        if self.history is None:
+            import sqlite3
+            from history import HistoryStore
+            try:
+                self.history = HistoryStore()
+            except (sqlite3.Error, ValueError) as e:
+                self.show_notification(f"Cannot open the session history: {e}", "error")
+        return self.history
+
+    def record_history(self, view):
+        """Keep a finished run of view in the history; written off the UI thread."""
+        store = self.history_store()
+        if store is not None:
+            from history import session_record
+            store.record_async(session_record(view.engine, view.session.name, view.bin_seconds))
+
+    def toggle_history(self):
+        if self.history_panel is not None:
+            self.history_panel.close()
+            return
+        store = self.history_store()
+        if store is not None:
+            from historypanel import HistoryPanel
+            self.history_panel = HistoryPanel(self, store, on_close=self.on_history_closed)
+
+    def on_history_closed(self):
+        self.history_panel = None
+
+    def export_metrics(self):
+        try:
+            self.metrics.write(self.metrics_path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", self.metrics_path, e)
+        self.after(METRICS_EXPORT_MS, self.export_metrics)
+
+    def schedule_tick(self):
+        """(Re)arm the one timer shared by all sessions for the earliest wakeup any of them needs."""
+        if self._tick_job is not None:
+            self.after_cancel(self._tick_job)
+            self._tick_job = None
+        wakeup = self.manager.next_wakeup_ms()
+        if wakeup is not None:
+            self._tick_job = self.after(wakeup, self.tick)
+
+    def tick(self):
+        self._tick_job = None
+        for session in self.manager.tick():
+            if session.engine.state != FINISHED:  # Finished runs are shown by SessionView.on_finished
+                self.renderer.mark(self.views[session.id].update_timer_label)
+        self.schedule_tick()
+
+    def recover_interrupted_sessions(self):
+        """Restore every unfinished session from its snapshot and journal tail, each paused in its own tab."""
+        paths = find_all_interrupted(sessions_dir())
+        if not paths:
+            return
+        # The first recovered session takes over the initial tab if nothing was counted in it yet
+        unused = self.current_view()
+        if unused is not None and (unused.engine.state != IDLE or len(unused.engine.events)):
+            unused = None
+        for path in paths:
+            view, unused = unused or self.new_session(), None
+            try:
+                view.recover(path)
+            except (OSError, ValueError, KeyError) as e:
+                self.show_notification(f"Could not recover session {path}: {e}", "error")
+        self.show_notification("Recovered interrupted sessions. Press Resume to continue.", "info")
+
+    def checkpoint_sessions(self):
+        for session in self.manager:
+            if session.engine.state in (RUNNING, PAUSED):
+                session.engine.checkpoint()
+        self.after(SNAPSHOT_INTERVAL_MS, self.checkpoint_sessions)
 
     def load_config(self):
+        self.default_config = DEFAULT_CONFIG
         try:
-            with open('config.json') as f:
-                config = json.load(f)
-                self.counters = [{'key': c['key'], 'name': c['name'], 'count': 0} for c in config.get('counters', [])]
-                self.target_duration = config.get('duration', 900)
-        except FileNotFoundError:
-            pass
+            config = self.config_store.load()
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable config: %s", e)
+            return
+        if config is not None:
+            self.default_config = config
 
-    def save_config(self):
-        config = {
-            'counters': [{'key': c['key'], 'name': c['name']} for c in self.counters],
-            'duration': self.target_duration
-        }
-        with open('config.json', 'w') as f:
-            json.dump(config, f)
+    def save_config(self, config):
+        """Make config the template for new sessions and queue it for a debounced background write."""
+        self.default_config = config
+        self.config_store.save(config)
 
     def show_notification(self, message, type_="info"):
-        if platform.system() == "Windows":
-            winsound.MessageBeep()
-            if type_ == "warning":
-                winsound.Beep(1000, 500)
-            else:
-                winsound.Beep(500, 500)
-        else:
-            print(f"Notification: {message}")  # Fallback for non-Windows systems
-        messagebox.showinfo("Notification", message)
+        """Report a message without blocking: a tone on a worker thread plus a status bar toast."""
+        self.notifier.notify(message, type_)
+
+    def add_status_bar(self):
+        """Adds the status bar used for non-modal notifications."""
+        self.status_label = ttk.Label(self, text="", anchor="w")
+        self.status_label.grid(row=3, column=0, sticky="ew")
+        self.notifier = MultiNotifier(
+            SoundNotifier(fallback=self.bell),
+            StatusBarNotifier(self.status_label),
+            LogNotifier(),
+        )
 
     def add_font_size_control(self):
         """Adds a control for adjusting the font size."""
         font_frame = ttk.Frame(self)
-        font_frame.grid(row=5, column=0, sticky="ew", pady=10)
+        font_frame.grid(row=2, column=0, sticky="ew", pady=10)
         ttk.Label(font_frame, text="Font Size:").pack(side=tk.LEFT)
+        self.font_size_label = ttk.Label(font_frame, text=f"{self.font_size}pt")
         self.font_scale = ttk.Scale(font_frame, from_=8, to=24, orient='horizontal', command=self.update_font_size)
         self.font_scale.set(self.font_size)  # Default font size
         self.font_scale.pack(side=tk.LEFT)
-        self.font_size_label = ttk.Label(font_frame, text=f"{self.font_size}pt")
         self.font_size_label.pack(side=tk.LEFT, padx=5)
 
     def update_font_size(self, value):
@@ -475,71 +848,63 @@ class AdvancedCounter(tk.Tk):
         # Update the font size variable
         self.font_size = int(float(value))
         self.font_size_label.config(text=f"{self.font_size}pt")
-        
-        # Re-render the counters display with the new font size
-        self.update_counters_display()
 
+        # Restyle the shared tile fonts; Tk re-renders every label using them, the grids only re-measure
+        self.apply_font_size()
+        for view in self.views.values():
+            view.counter_grid.relayout()
+
+    def apply_font_size(self):
+        """Apply self.font_size to the named fonts shared by all counter tiles."""
+        self.name_font.configure(size=self.font_size)
+        self.key_font.configure(size=max(self.font_size - 2, 8))  # Ensure minimum size of 8
+        self.count_font.configure(size=self.font_size + 12)  # Larger font for count
+
+    def on_close(self):
+        """Flush the journals of runs in progress before the window goes away."""
+        for session in self.manager:
+            session.engine.close_journal()
+        if self.ingest is not None:
+            self.ingest.close()
+        self.renderer.close()
+        if self.metrics_path is not None:
+            self.metrics.write(self.metrics_path)
+        self.config_store.close()
+        if self.history is not None:
+            self.history.close()
+        self.notifier.close()
+        self.destroy()
+
+
+def main():
+    if sys.argv[1:2] == ['replay']:  # Headless recount of recorded sessions, no window
+        from replay import main as replay_main
+        sys.exit(replay_main(sys.argv[2:]))
+    import argparse
+    parser = argparse.ArgumentParser(description="Advanced tally counter with timer.",
+                                     epilog="Run 'counter.py replay -h' to recount recorded sessions without the GUI.")
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help="maximum display refreshes per second")
+    parser.add_argument('--metrics', action='store_true', help="collect performance metrics from startup")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="collect metrics and write them here every few seconds (.json, else Prometheus text)")
+    parser.add_argument('--ingest-tcp', type=int, metavar='PORT', help="accept increments on this localhost TCP port")
+    parser.add_argument('--ingest-udp', type=int, metavar='PORT', help="accept increments on this localhost UDP port")
+    parser.add_argument('--ingest-unix', metavar='PATH', help="accept increments on this Unix domain socket")
+    parser.add_argument('--ingest-host', default='127.0.0.1', help="address the TCP/UDP endpoints bind to")
+    args = parser.parse_args()
+    ingest = None
+    if args.ingest_tcp is not None or args.ingest_udp is not None or args.ingest_unix is not None:
+        from ingest import IngestServer  # asyncio is slow to import, so only when asked for
+        ingest = IngestServer(args.ingest_tcp, args.ingest_udp, args.ingest_unix, host=args.ingest_host)
+        try:
+            ingest.start()
+        except OSError as e:
+            parser.error(f"cannot start the ingest server: {e}")
+    if args.fps <= 0:
+        parser.error("--fps must be positive")
+    app = AdvancedCounter(ingest=ingest, fps=args.fps, metrics=args.metrics, metrics_path=args.metrics_file)
+    app.mainloop()
 
-    def update_counters_display(self):
-        """Redesign the layout of counters in a grid format with Remove buttons."""
-        # Clear all existing widgets in the counters_frame
-        for widget in self.counters_frame.winfo_children():
-            widget.destroy()
-
-        # Loop through each counter and create its UI representation
-        for idx, counter in enumerate(self.counters):
-            # Create a frame for each counter
-            frame = ttk.Frame(self.counters_frame, relief="solid", padding=10)
-            frame.grid(row=idx // 3, column=idx % 3, padx=5, pady=5, sticky="nsew")
-
-            # Object Name (Bold, size based on self.font_size)
-            ttk.Label(
-                frame,
-                text=counter['name'],
-                font=('Helvetica', self.font_size, 'bold')
-            ).pack()
-
-            # Key Instruction (Regular font, slightly smaller than self.font_size)
-            ttk.Label(
-                frame,
-                text=f"Press '{counter['key']}'",
-                font=('Helvetica', max(self.font_size - 2, 8))  # Ensure minimum size of 8
-            ).pack()
-
-            # Count (Bold, larger than self.font_size)
-            ttk.Label(
-                frame,
-                text=str(counter['count']),
-                font=('Helvetica', self.font_size + 12, 'bold')  # Larger font for count
-            ).pack()
-
-            # Remove Button (Underneath the labels)
-            remove_btn = ttk.Button(frame, text="Remove", command=lambda c=counter: self.remove_counter(c))
-            remove_btn.pack(pady=(5, 0))  # Add padding above the button
-
-        # Configure column weights to ensure proper resizing
-        self.counters_frame.grid_columnconfigure(0, weight=1)
-        self.counters_frame.grid_columnconfigure(1, weight=1)
-        self.counters_frame.grid_columnconfigure(2, weight=1)
-
-        # Update the layout and scroll region if needed
-        self.counters_frame.update_idletasks()
-
-    def on_mouse_wheel(self, event):
-        """Handle mouse wheel scrolling for the canvas."""
-        if platform.system() == "Windows":
-            # On Windows, the delta value is usually larger (e.g., 120)
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        elif platform.system() == "Darwin":  # macOS
-            # On macOS, the delta value is smaller (e.g., 1 or -1)
-            self.canvas.yview_scroll(-1 * event.delta, "units")
-        else:  # Linux
-            # On Linux, Button-4 is scroll up, Button-5 is scroll down
-            if event.num == 4:
-                self.canvas.yview_scroll(-1, "units")
-            elif event.num == 5:
-                self.canvas.yview_scroll(1, "units")
 
 if __name__ == "__main__":
-    app = AdvancedCounter()
-    app.mainloop()
\ No newline at end of file
+    main()
@@ -0,0 +1,48 @@
+import tkinter as tk
+from tkinter import ttk
+
+REFRESH_MS = 500
+
+
+class DiagnosticsPanel(tk.Toplevel):
+    """Live view of the app's metrics (see metrics.Metrics), refreshed while open."""
+
+    def __init__(self, parent, metrics, on_close=None):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.geometry("560x300")
+        self.metrics = metrics
+        self.on_close = on_close
+        self.tree = ttk.Treeview(self, columns=('count', 'mean', 'p95', 'max'), show='tree headings')
+        self.tree.heading('#0', text='Metric')
+        self.tree.column('#0', width=200)
+        for column, text in (('count', 'Count / Value'), ('mean', 'Mean (ms)'), ('p95', 'p95 (ms)'), ('max', 'Max (ms)')):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=80, anchor='e')
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._job = None
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        snapshot = self.metrics.snapshot()
+        for name, stats in snapshot['histograms'].items():
+            self.tree.insert('', tk.END, text=name, values=(
+                stats['count'],
+                f"{stats['mean'] * 1000:.3f}",
+                f"{stats['p95'] * 1000:.3f}",
+                f"{stats['max'] * 1000:.3f}",
+            ))
+        for kind in ('gauges', 'counters'):
+            for name, value in snapshot[kind].items():
+                self.tree.insert('', tk.END, text=name, values=(value, '', '', ''))
+        self._job = self.after(REFRESH_MS, self.refresh)
+
+    def close(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.destroy()
+        if self.on_close is not None:
+            self.on_close()
@@ -0,0 +1,345 @@
+import math
+import os
+import time
+
+from events import MB, EventLog, RollingEventLog
+from recovery import (SNAPSHOT_VERSION, INTERRUPTED_STATES, discard_snapshot, snapshot_path, write_snapshot,
+                      write_snapshot_async)
+from registry import CounterRegistry
+from timer import NS_PER_MS, NS_PER_SECOND, SegmentTimer
+
+IDLE = 'idle'
+RUNNING = 'running'
+PAUSED = 'paused'
+FINISHED = 'finished'
+
+EVENTS = ('increment', 'counters', 'state', 'finished')
+
+
+class CounterEngine:
+    """Counters, timer state machine and results, with no dependency on Tk.
+
+    Views subscribe to engine events instead of reading attributes after
+    every action:
+
+    * ``increment(key, slot)`` after a counted keypress (once per key for a batch)
+    * ``counters()`` after counters are added, removed or reloaded
+    * ``state(state)`` after every timer state change
+    * ``finished(results)`` when the timer is stopped or runs out
+    """
+
+    def __init__(self, counters=(), duration=900, clock=time.monotonic_ns, memory_limit_mb=None):
+        self.counters = CounterRegistry(counters)
+        self.duration = duration  # Target duration in seconds
+        self.memory_limit_mb = memory_limit_mb  # Set for long-run mode: the event history stays under it
+        self.state = IDLE
+        self.timer = SegmentTimer(clock=clock)
+        self.events = self.new_event_log()  # The counted presses of the current run
+        self.journal = None  # Optional journal.JournalWriter mirroring self.events
+        self.journal_records = 0  # Records written to the journal during this run
+        self._running = False  # Hot-path copy of state == RUNNING
+        self._listeners = {event: [] for event in EVENTS}
+
+    def subscribe(self, event, callback):
+        self._listeners[event].append(callback)
+
+    def unsubscribe(self, event, callback):
+        self._listeners[event].remove(callback)
+
+    def _emit(self, event, *args):
+        for callback in self._listeners[event]:
+            callback(*args)
+
+    # Counting
+
+    def increment(self, key):
+        """Count one press of key; return the counter slot, or None if it was not counted.
+
+        A press at or past the target duration is not counted; it finishes the run.
+        """
+        if not self._running:
+            return None
+        t_ns = self.timer.elapsed_ns()
+        if t_ns >= self.duration * NS_PER_SECOND:
+            self._finish()
+            return None
+        slot = self.counters.increment(key)
+        if slot is not None:
+            self.events.append(t_ns, slot)
+            if self.journal is not None:
+                self.journal.append(t_ns, slot, key)
+                self.journal_records += 1
+            if self._listeners['increment']:
+                self._emit('increment', key, slot)
+        return slot
+
+    def increment_many(self, keys):
+        """Count a batch of presses; return how many were counted.
+
+        The batch is stamped with a single clock read, as it arrived at once;
+        a batch at or past the target duration is not counted and finishes
+        the run. Listeners hear about each counted key once per batch, not
+        once per press.
+        """
+        if not self._running:
+            return 0
+        t_ns = self.timer.elapsed_ns()
+        if t_ns >= self.duration * NS_PER_SECOND:
+            self._finish()
+            return 0
+        increment, append = self.counters.increment, self.events.append
+        journal = self.journal
+        touched = {}
+        counted = 0
+        for key in keys:
+            slot = increment(key)
+            if slot is not None:
+                counted += 1
+                append(t_ns, slot)
+                if journal is not None:
+                    journal.append(t_ns, slot, key)
+                touched[key] = slot
+        if journal is not None:
+            self.journal_records += counted
+        if self._listeners['increment']:
+            for key, slot in touched.items():
+                self._emit('increment', key, slot)
+        return counted
+
+    def new_event_log(self):
+        """An empty event log: memory-bounded in long-run mode, else holding every press."""
+        if self.memory_limit_mb:
+            return RollingEventLog(int(self.memory_limit_mb * MB))
+        return EventLog()
+
+    def attach_journal(self, journal):
+        """Mirror every counted press of the run into journal until the run ends."""
+        self.close_journal()
+        self.journal = journal
+
+    def close_journal(self):
+        """Close the journal of the run, if any.
+
+        A run still in progress gets a final snapshot to be recovered from;
+        the snapshot of a run that is over is deleted, so startup does not
+        read it again.
+        """
+        if self.journal is not None:
+            self.journal.close()  # Writes every pending record, so the snapshot can count them all
+            if self.state in INTERRUPTED_STATES:
+                self.checkpoint(background=False)
+            else:
+                discard_snapshot(snapshot_path(self.journal.path))
+            self.journal = None
+
+    # Snapshots and recovery
+
+    def snapshot(self):
+        """Return the run state as a JSON-serializable dict (see recovery.py)."""
+        return {
+            'version': SNAPSHOT_VERSION,
+            'taken_ns': time.monotonic_ns(),
+            'journal': os.path.abspath(self.journal.path) if self.journal is not None else None,
+            'events': self.journal_records,
+            'state': self.state,
+            'duration': self.duration,
+            'memory_limit_mb': self.memory_limit_mb,
+            'elapsed_ns': self.timer.elapsed_ns(),
+            'speed': self.timer.speed,
+            'segments': list(self.timer.segments),
+            'counters': [dict(c, count=self.counters.count(c['key'])) for c in self.counters.to_config()],
+        }
+
+    def checkpoint(self, background=True):
+        """Write a snapshot next to the journal so the run can be recovered after a crash.
+
+        The snapshot is written only once the journal holds every record it
+        counts, so recovery never resumes from an offset past the journal's end.
+        """
+        if self.journal is None:
+            return
+        path = snapshot_path(self.journal.path)
+        if background:
+            write_snapshot_async(path, self.snapshot(), self.journal)
+        elif self.journal.wait_written(self.journal_records):
+            write_snapshot(path, self.snapshot())
+
+    def restore(self, snapshot, tail=()):
+        """Load a snapshot and replay the journal records written after it.
+
+        An interrupted run comes back paused; the events before the snapshot
+        are not loaded here (see merge_event_history).
+        """
+        self.counters.clear()
+        for c in snapshot['counters']:
+            self.counters.add(c['key'], c['name'], c['count'], c.get('debounce_ms', 0))
+        self.duration = snapshot['duration']
+        self.memory_limit_mb = snapshot.get('memory_limit_mb')
+        self.events = self.new_event_log()
+        elapsed_ns = snapshot['elapsed_ns']
+        increment, append = self.counters.increment, self.events.append
+        for t_ns, _, key in tail:
+            slot = increment(key)
+            if slot is not None:
+                append(t_ns, slot)
+            elapsed_ns = max(elapsed_ns, t_ns)
+        self.journal_records = snapshot['events'] + len(tail)
+        self.timer.restore(elapsed_ns, snapshot['segments'], snapshot['speed'])
+        self._emit('counters')
+        self._set_state(PAUSED if snapshot['state'] in INTERRUPTED_STATES else snapshot['state'])
+
+    def replay(self, records, speed=1.0):
+        """Recount recorded (t_ns, slot, key) presses at their recorded times, ignoring the clock.
+
+        Records are counted against the current counters and duration, so a
+        session can be re-analysed with another mapping or cut-off. Recorded
+        times are session time; debounce windows are real milliseconds (as in
+        keyinput.InputEngine), so they are scaled by the speed the session ran
+        at. A session whose speed changed is approximated with one speed. The
+        run ends finished. Returns the number of presses counted.
+        """
+        self.reset()
+        counters = self.counters
+        debounce = {key: int(counters.debounce[slot] * NS_PER_MS * speed)
+                    for key, slot in counters.index.items() if counters.debounce[slot]}
+        last_ns = {}
+        limit = self.duration_ns
+        increment, append = counters.increment, self.events.append
+        elapsed_ns = counted = 0
+        for t_ns, _, key in records:
+            if t_ns >= limit:
+                elapsed_ns = limit
+                break
+            elapsed_ns = t_ns
+            window = debounce.get(key)
+            if window:
+                if t_ns - last_ns.get(key, -window) < window:
+                    continue
+                last_ns[key] = t_ns
+            slot = increment(key)
+            if slot is not None:
+                append(t_ns, slot)
+                counted += 1
+        self.timer.restore(elapsed_ns, [], 1.0)
+        self._set_state(FINISHED)
+        return counted
+
+    def merge_event_history(self, history):
+        """Put events loaded from the journal in front of the ones recorded since recovery."""
+        history.extend(self.events)
+        self.events = history
+
+    def add_counter(self, key, name, debounce_ms=0):
+        """Add a counter. Raises KeyError if the key is already bound, ValueError if it is too long."""
+        self.counters.add(key, name, debounce_ms=debounce_ms)
+        self._emit('counters')
+
+    def remove_counter(self, key):
+        self.counters.remove(key)
+        self._emit('counters')
+
+    def load_counters(self, counters):
+        self.counters.load_config(counters)
+        self._emit('counters')
+
+    # Timer state machine
+
+    def _set_state(self, state):
+        self.state = state
+        self._running = state == RUNNING
+        self._emit('state', state)
+
+    def start(self, duration=None):
+        """Start a new run. Raises RuntimeError if one is already in progress."""
+        if self.state in (RUNNING, PAUSED):
+            raise RuntimeError("Timer is already running.")
+        if duration is not None:
+            self.duration = duration
+        self.close_journal()
+        self.timer.reset()
+        self.events = self.new_event_log()
+        self.journal_records = 0
+        self.counters.recycle()
+        self.timer.start()
+        self._set_state(RUNNING)
+
+    def pause(self):
+        if self.state == RUNNING:
+            self.tick()
+            if self.state == RUNNING:
+                self.timer.stop()
+                self._set_state(PAUSED)
+
+    def resume(self):
+        if self.state == PAUSED:
+            self.timer.start()
+            self._set_state(RUNNING)
+
+    def stop(self):
+        if self.state in (RUNNING, PAUSED):
+            self.tick()
+            if self.state != FINISHED:
+                self._finish()
+
+    def reset(self):
+        """Return to idle with all counts zeroed."""
+        self.timer.reset()
+        self.events = self.new_event_log()
+        self.counters.recycle()
+        self.state = IDLE  # So close_journal discards the snapshot
+        self.close_journal()
+        self.counters.reset_counts()
+        self._set_state(IDLE)
+
+    @property
+    def speed(self):
+        return self.timer.speed
+
+    def set_speed(self, speed):
+        self.timer.set_speed(speed)
+
+    @property
+    def duration_ns(self):
+        return int(self.duration * NS_PER_SECOND)
+
+    @property
+    def elapsed_time(self):
+        """Scaled elapsed time in seconds, capped at the target duration."""
+        return min(self.timer.elapsed_ns(), self.duration_ns) / NS_PER_SECOND
+
+    def tick(self):
+        """Finish the run if the target has been reached; return the elapsed time in seconds."""
+        if self.state == RUNNING and self.timer.elapsed_ns() >= self.duration_ns:
+            self._finish()
+        return self.elapsed_time
+
+    def next_wakeup_ms(self):
+        """Milliseconds until the displayed second changes or the run expires; None unless running."""
+        if self.state != RUNNING:
+            return None
+        wait_ns = self.timer.next_wakeup_ns(self.duration_ns)
+        return max(1, math.ceil(wait_ns / NS_PER_MS))
+
+    def _finish(self):
+        self.timer.stop()
+        self.state = FINISHED  # So close_journal discards the snapshot, before listeners run
+        self.close_journal()
+        self._set_state(FINISHED)
+        self._emit('finished', self.results())
+
+    # Results
+
+    def results(self):
+        """Return the totals as a list of {'key', 'name', 'count'} in display order."""
+        return [{'key': key, 'name': name, 'count': count} for key, name, count in self.counters.items()]
+
+    def analytics(self, bin_seconds=30):
+        """Rates, time bins and interval statistics for the run (requires NumPy, see analytics.py)."""
+        from analytics import analyze_engine
+        return analyze_engine(self, bin_seconds)
+
+    def to_config(self):
+        config = {'counters': self.counters.to_config(), 'duration': self.duration}
+        if self.memory_limit_mb:
+            config['memory_limit_mb'] = self.memory_limit_mb
+        return config
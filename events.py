@@ -0,0 +1,182 @@
+import collections
+from array import array
+
+from timer import NS_PER_SECOND
+
+MB = 1024 * 1024
+DEFAULT_MEMORY_LIMIT_MB = 64
+RAW_EVENT_BYTES = 12  # int64 time + uint32 slot
+ROLLUP_ENTRY_BYTES = 100  # Upper bound for one (bucket, slot) count in the nested dicts; ~75 measured
+RAW_SHARE = 0.75  # Part of the memory limit for raw events; the rest is for rollups
+MIN_CAPACITY = 1024
+# Rollup resolutions, finest first: per second, per minute, per hour
+RESOLUTIONS_NS = (NS_PER_SECOND, 60 * NS_PER_SECOND, 3600 * NS_PER_SECOND)
+
+
+class EventLog:
+    """In-memory record of counted keypresses as parallel arrays.
+
+    ``times[i]`` is the scaled session time of event i in nanoseconds (see
+    timer.SegmentTimer) and ``slots[i]`` the registry slot it was counted on.
+    """
+
+    __slots__ = ('times', 'slots')
+
+    def __init__(self):
+        self.times = array('q')
+        self.slots = array('I')
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, t_ns, slot):
+        self.times.append(t_ns)
+        self.slots.append(slot)
+
+    def clear(self):
+        self.times = array('q')
+        self.slots = array('I')
+
+    def extend(self, other):
+        """Append the events of a log recorded after this one."""
+        self.times.extend(other.times)
+        self.slots.extend(other.slots)
+
+    def rollup(self):
+        """Counts of events no longer held one by one; None, since every event is kept."""
+        return None
+
+    def memory_bytes(self):
+        return len(self.times) * RAW_EVENT_BYTES
+
+
+class RollingEventLog:
+    """An EventLog for long runs whose memory stays under memory_limit bytes however long the run.
+
+    ``times``/``slots`` hold only the newest presses, up to ``capacity``.
+    When that window is full, its oldest part is folded into per-second
+    counts. Each resolution gets a third of the rollup budget; past it,
+    the oldest seconds are merged into minutes, minutes into hours, and
+    hours into per-counter counts with no time (``before``), which take
+    their share of the hours' third. Totals and
+    rates stay exact; only the timing of old presses gets coarser.
+    """
+
+    def __init__(self, memory_limit):
+        self.memory_limit = memory_limit
+        self.capacity = max(MIN_CAPACITY, int(memory_limit * RAW_SHARE) // RAW_EVENT_BYTES)
+        self.fold_batch = self.capacity // 16  # Folding in batches keeps append cheap
+        self.level_budget = max(1, int(memory_limit * (1 - RAW_SHARE)) // ROLLUP_ENTRY_BYTES // len(RESOLUTIONS_NS))
+        self.times = array('q')
+        self.slots = array('I')
+        self.levels = [{} for _ in RESOLUTIONS_NS]  # bucket number -> {slot: count}, oldest first
+        self.entries = [0] * len(RESOLUTIONS_NS)  # (bucket, slot) counts held per level
+        self.before = {}  # slot -> count of presses older than every hour bucket
+        self.before_ns = None  # Start of the oldest hour merged into before
+        self.folded = 0  # Presses no longer held one by one
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, t_ns, slot):
+        self.times.append(t_ns)
+        self.slots.append(slot)
+        if len(self.times) >= self.capacity:
+            self._fold(self.fold_batch)
+
+    def clear(self):
+        self.__init__(self.memory_limit)
+
+    def extend(self, other):
+        """Append the events of a log recorded after this one, rollups included."""
+        for level, bucket, slot, count in _buckets(other):
+            counts = self.levels[level].setdefault(bucket, {})
+            if slot not in counts:
+                self.entries[level] += 1
+            counts[slot] = counts.get(slot, 0) + count
+        for slot, count in getattr(other, 'before', {}).items():
+            self.before[slot] = self.before.get(slot, 0) + count
+        if self.before_ns is None:
+            self.before_ns = getattr(other, 'before_ns', None)
+        self.folded += getattr(other, 'folded', 0)
+        for t_ns, slot in zip(other.times, other.slots):
+            self.append(t_ns, slot)
+        self._coarsen()
+
+    def _fold(self, n):
+        # Arrays are replaced, not trimmed in place, so exports holding the old ones stay consistent
+        counts = collections.Counter(zip([t_ns // NS_PER_SECOND for t_ns in self.times[:n]], self.slots[:n]))
+        self.times, self.slots = self.times[n:], self.slots[n:]
+        self.folded += n
+        seconds = self.levels[0]
+        added = 0
+        for (second, slot), count in counts.items():
+            target = seconds.get(second)
+            if target is None:
+                target = seconds[second] = {}
+            if slot in target:
+                target[slot] += count
+            else:
+                target[slot] = count
+                added += 1
+        self.entries[0] += added
+        self._coarsen()
+
+    def _coarsen(self):
+        levels, entries = self.levels, self.entries
+        for level, buckets in enumerate(levels):
+            coarser = levels[level + 1] if level + 1 < len(levels) else None
+            # The hours share their budget with what has been merged into before
+            budget = self.level_budget if coarser is not None else self.level_budget - len(self.before)
+            while entries[level] > budget and buckets:
+                bucket = next(iter(buckets))  # Buckets are created in time order
+                counts = buckets.pop(bucket)
+                entries[level] -= len(counts)
+                if coarser is None:
+                    target = self.before
+                    if self.before_ns is None:
+                        self.before_ns = bucket * RESOLUTIONS_NS[level]
+                else:
+                    coarse = bucket * RESOLUTIONS_NS[level] // RESOLUTIONS_NS[level + 1]
+                    target = coarser.get(coarse)
+                    if target is None:
+                        target = coarser[coarse] = {}
+                added = 0
+                for slot, count in counts.items():
+                    if slot in target:
+                        target[slot] += count
+                    else:
+                        target[slot] = count
+                        added += 1
+                if coarser is not None:
+                    entries[level + 1] += added
+                else:
+                    budget -= added
+
+    def rollup(self):
+        """(times, slots, counts) arrays of the folded presses: one entry per bucket and counter.
+
+        Times are bucket starts; presses merged into ``before`` are placed at
+        the start of the oldest hour they came from.
+        """
+        times, slots, counts = array('q'), array('I'), array('q')
+        for level, bucket, slot, count in _buckets(self):
+            times.append(bucket * RESOLUTIONS_NS[level])
+            slots.append(slot)
+            counts.append(count)
+        for slot, count in self.before.items():
+            times.append(self.before_ns)
+            slots.append(slot)
+            counts.append(count)
+        return times, slots, counts
+
+    def memory_bytes(self):
+        return len(self.times) * RAW_EVENT_BYTES + (sum(self.entries) + len(self.before)) * ROLLUP_ENTRY_BYTES
+
+
+def _buckets(log):
+    """(level, bucket, slot, count) of every rollup count of log; nothing for a plain EventLog."""
+    for level, buckets in enumerate(getattr(log, 'levels', ())):
+        for bucket, counts in buckets.items():
+            for slot, count in counts.items():
+                yield level, bucket, slot, count
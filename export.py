@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import math
+import os
+import threading
+
+CHUNK_ROWS = 65536  # Rows materialized at a time; bounds memory for any session length
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+DATASETS = ('totals', 'bins', 'events')
+
+HEADERS = {
+    'totals': ['Object Name', 'Total Count'],
+    'bins': ['Object Name', 'Bin Start (s)', 'Bin End (s)', 'Count', 'Cumulative'],
+    'events': ['Time (ns)', 'Key', 'Object Name'],
+}
+# Column names for formats that need identifiers rather than captions
+FIELDS = {
+    'totals': ['name', 'count'],
+    'bins': ['name', 'bin_start', 'bin_end', 'count', 'cumulative'],
+    'events': ['time_ns', 'key', 'name'],
+}
+
+
+def format_for(path):
+    """Pick the export format from the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported export format: {ext or path}")
+    return FORMATS[ext]
+
+
+class ExportSource:
+    """Everything an export needs, captured on the UI thread so a worker can stream it.
+
+    The event arrays are referenced, not copied; only the first n_events are
+    exported, so presses counted while the export runs are left out. In a
+    long run only the presses still held one by one are exported as events;
+    the older ones are in the totals and bins through the rollup.
+    """
+
+    def __init__(self, engine, bin_seconds=30):
+        self.results = engine.results()
+        self.index = dict(engine.counters.index)
+        self.keys = list(engine.counters.keys)
+        self.names = list(engine.counters.names)
+        self.times = engine.events.times
+        self.slots = engine.events.slots
+        self.n_events = len(engine.events)
+        self.rollup = engine.events.rollup()  # Counts folded out of the events in a long run, else None
+        self.elapsed = engine.elapsed_time
+        self.bin_seconds = bin_seconds
+
+    def row_count(self, dataset):
+        if dataset == 'events':
+            return self.n_events
+        if dataset == 'bins':
+            # One row per counter and bin, binned as analytics.analyze does
+            n_bins = max(1, math.ceil(self.elapsed / self.bin_seconds)) if self.elapsed > 0 else 1
+            return len(self.results) * n_bins
+        return len(self.results)
+
+    def chunks(self, dataset):
+        """Yield lists of rows for the totals and bins datasets."""
+        if dataset == 'totals':
+            yield [(r['name'], r['count']) for r in self.results]
+        elif dataset == 'bins':
+            yield from self._bin_chunks()
+        else:
+            raise ValueError(f"Unknown dataset: {dataset}")
+
+    def event_chunks(self):
+        """Yield (times, slots) array slices of at most CHUNK_ROWS events."""
+        for start in range(0, self.n_events, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, self.n_events)
+            yield self.times[start:end], self.slots[start:end]
+
+    def _bin_chunks(self):
+        from analytics import analyze  # Needs NumPy
+        import numpy as np
+        times = np.frombuffer(self.times[:self.n_events], dtype=np.int64)
+        slots = np.frombuffer(self.slots[:self.n_events], dtype=np.uint32)
+        counters = [(r['key'], r['name'], self.index[r['key']]) for r in self.results]
+        rollup = None
+        if self.rollup is not None:
+            rollup = tuple(np.array(column, dtype=np.int64) for column in self.rollup)
+        analysis = analyze(times, slots, counters, self.elapsed, self.bin_seconds, rollup)
+        starts = analysis['bin_starts']
+        for result in analysis['counters']:
+            yield [(result['name'], int(start), int(start + self.bin_seconds), int(count), int(total))
+                   for start, count, total in zip(starts, result['bins'], result['cumulative'])]
+
+
+def write_csv(path, dataset, source, progress):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS[dataset])
+        if dataset == 'events':
+            # Everything after the timestamp depends only on the slot, so quote it once per slot
+            line = io.StringIO()
+            line_writer = csv.writer(line)
+            suffixes = []
+            for key, name in zip(source.keys, source.names):
+                line.seek(0)
+                line.truncate()
+                line_writer.writerow(['', key, name])
+                suffixes.append(line.getvalue())
+            for times, slots in source.event_chunks():
+                file.write(''.join([f"{t_ns}{suffixes[slot]}" for t_ns, slot in zip(times, slots)]))
+                progress(len(times))
+        else:
+            for rows in source.chunks(dataset):
+                writer.writerows(rows)
+                progress(len(rows))
+
+
+def write_jsonl(path, dataset, source, progress):
+    fields = FIELDS[dataset]
+    with open(path, 'w') as file:
+        if dataset == 'events':
+            suffixes = [f', "key": {json.dumps(key)}, "name": {json.dumps(name)}}}\n'
+                        for key, name in zip(source.keys, source.names)]
+            for times, slots in source.event_chunks():
+                file.write(''.join([f'{{"time_ns": {t_ns}{suffixes[slot]}' for t_ns, slot in zip(times, slots)]))
+                progress(len(times))
+        else:
+            for rows in source.chunks(dataset):
+                file.write(''.join(json.dumps(dict(zip(fields, row))) + '\n' for row in rows))
+                progress(len(rows))
+
+
+def write_parquet(path, dataset, source, progress):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).") from None
+    fields = FIELDS[dataset]
+    writer = None
+    try:
+        if dataset == 'events':
+            # Keys and names are dictionary encoded on the slot, so each chunk is two flat buffers
+            keys = pa.array(source.keys, pa.string())
+            names = pa.array(source.names, pa.string())
+            for times, slots in source.event_chunks():
+                indices = pa.array(slots, pa.uint32())
+                table = pa.table({
+                    'time_ns': pa.array(times, pa.int64()),
+                    'key': pa.DictionaryArray.from_arrays(indices, keys),
+                    'name': pa.DictionaryArray.from_arrays(indices, names),
+                })
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                progress(len(times))
+        else:
+            for rows in source.chunks(dataset):
+                columns = list(zip(*rows)) if rows else [[] for _ in fields]
+                table = pa.table({field: list(column) for field, column in zip(fields, columns)})
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                progress(len(rows))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'parquet': write_parquet}
+
+
+def export(source, dataset, path, progress=lambda rows: None):
+    """Stream dataset from source to path in the format given by its extension."""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    WRITERS[format_for(path)](path, dataset, source, progress)
+
+
+class ExportTask:
+    """An export running on a worker thread; poll ``fraction`` and ``done`` from the UI."""
+
+    def __init__(self, source, dataset, path):
+        self.path = path
+        self.total = max(1, source.row_count(dataset))
+        self.written = 0
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, args=(source, dataset, path), name="export", daemon=True)
+        self._thread.start()
+
+    @property
+    def fraction(self):
+        return min(1.0, self.written / self.total)
+
+    def _progress(self, rows):
+        self.written += rows
+
+    def _run(self, source, dataset, path):
+        try:
+            export(source, dataset, path, self._progress)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
@@ -0,0 +1,265 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from paths import data_dir
+
+HISTORY_NAME = 'history.sqlite3'
+SCHEMA_VERSION = 1
+DEFAULT_LIMIT = 500
+
+logger = logging.getLogger("counter")
+
+# totals repeats finished_at so "counter X over the last N sessions" is one
+# backwards range scan of totals_counter, which also covers the selected
+# columns, plus a primary key lookup per row for the session name.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    duration REAL,
+    elapsed REAL,
+    bin_seconds REAL,
+    config_hash TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    finished_at REAL NOT NULL,
+    counter_key TEXT,
+    counter_name TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bins (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    counter_name TEXT NOT NULL,
+    bin_start REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_finished ON sessions(finished_at);
+CREATE INDEX IF NOT EXISTS sessions_config ON sessions(config_hash, finished_at);
+CREATE INDEX IF NOT EXISTS totals_counter ON totals(counter_name, finished_at, session_id, count);
+CREATE INDEX IF NOT EXISTS totals_session ON totals(session_id);
+CREATE INDEX IF NOT EXISTS bins_session ON bins(session_id, counter_name);
+"""
+
+# Header row of each export dataset (see export.HEADERS), for recognizing CSV files on import
+CSV_HEADERS = {
+    ('Object Name', 'Total Count'): 'totals',
+    ('Object Name', 'Bin Start (s)', 'Bin End (s)', 'Count', 'Cumulative'): 'bins',
+    ('Time (ns)', 'Key', 'Object Name'): 'events',
+}
+
+
+def default_history_path():
+    return os.path.join(data_dir(), HISTORY_NAME)
+
+
+def config_hash(config):
+    """Identify a counter mapping: the same keys and names hash the same whatever the duration."""
+    counters = sorted((c.get('key') or '', c['name']) for c in config.get('counters', []))
+    return hashlib.sha1(json.dumps(counters).encode('utf-8')).hexdigest()[:16]
+
+
+def session_record(engine, name, bin_seconds=30, source='app'):
+    """Capture a finished run for HistoryStore.record; cheap enough for the UI thread.
+
+    The per-bin counts are computed later, by whoever records it.
+    """
+    from export import ExportSource
+    return {
+        'finished_at': time.time(),
+        'name': name,
+        'source': source,
+        'duration': engine.duration,
+        'elapsed': engine.elapsed_time,
+        'bin_seconds': bin_seconds,
+        'config': engine.to_config(),
+        'totals': [(r['key'], r['name'], r['count']) for r in engine.results()],
+        'bins': ExportSource(engine, bin_seconds),
+    }
+
+
+def read_csv_export(path):
+    """Turn a CSV export (totals, bins or events) into a session record."""
+    with open(path, newline='') as f:
+        rows = csv.reader(f)
+        header = tuple(next(rows, ()))
+        dataset = CSV_HEADERS.get(header)
+        if dataset is None:
+            raise ValueError(f"{path} is not a CSV export of the counter")
+        totals = {}  # name -> [key, count]
+        bins = []
+        bin_seconds = elapsed = None
+        for row in rows:
+            if not row:
+                continue
+            if dataset == 'totals':
+                totals[row[0]] = [None, int(row[1])]
+            elif dataset == 'bins':
+                name, start, end = row[0], float(row[1]), float(row[2])
+                bins.append((name, start, int(row[3])))
+                totals.setdefault(name, [None, 0])[1] = int(row[4])  # Cumulative; the last bin is the total
+                bin_seconds, elapsed = end - start, max(elapsed or 0, end)
+            else:
+                t_ns, key, name = int(row[0]), row[1], row[2]
+                totals.setdefault(name, [key, 0])[1] += 1
+                elapsed = max(elapsed or 0, t_ns / 1e9)
+    counters = [{'key': key, 'name': name} for name, (key, _) in totals.items()]
+    return {
+        'finished_at': os.path.getmtime(path),
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'source': 'import',
+        'duration': None,
+        'elapsed': elapsed,
+        'bin_seconds': bin_seconds,
+        'config': {'counters': counters},
+        'totals': [(key, name, count) for name, (key, count) in totals.items()],
+        'bins': bins,
+    }
+
+
+class HistoryStore:
+    """Completed sessions in a local SQLite database (WAL mode), indexed for queries across runs.
+
+    Every session keeps its config, totals and per-bin counts. Writes and
+    queries share one connection under a lock; ``record_async`` writes on
+    a worker thread so finishing a run never waits for the disk.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; a crash can only lose the last sessions
+        self.db.execute("PRAGMA foreign_keys=ON")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"{self.path} was written by a newer version (schema {version})")
+        self.db.executescript(SCHEMA)
+        self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._lock = threading.Lock()
+        self._writers = []
+
+    # Writing
+
+    def record(self, record):
+        """Store one session record (see session_record); return its id."""
+        return self.record_many([record])[0]
+
+    def record_many(self, records):
+        """Store session records in a single transaction; return their ids."""
+        prepared = [(record, list(self._bin_rows(record))) for record in records]
+        ids = []
+        with self._lock, self.db:
+            for record, bins in prepared:
+                config = record['config']
+                cursor = self.db.execute(
+                    "INSERT INTO sessions (finished_at, name, source, duration, elapsed, bin_seconds, config_hash, config)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (record['finished_at'], record['name'], record['source'], record['duration'], record['elapsed'],
+                     record['bin_seconds'], config_hash(config), json.dumps(config)))
+                session_id = cursor.lastrowid
+                self.db.executemany(
+                    "INSERT INTO totals (session_id, finished_at, counter_key, counter_name, count) VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, record['finished_at'], key, name, count) for key, name, count in record['totals']])
+                self.db.executemany(
+                    "INSERT INTO bins (session_id, counter_name, bin_start, count) VALUES (?, ?, ?, ?)",
+                    [(session_id, *row) for row in bins])
+                ids.append(session_id)
+        return ids
+
+    def _bin_rows(self, record):
+        """(counter name, bin start, count) rows; computed here for records captured from an engine."""
+        bins = record['bins']
+        if isinstance(bins, list):
+            return bins
+        try:
+            return [(name, start, count) for chunk in bins.chunks('bins') for name, start, _, count, _ in chunk]
+        except ImportError:  # Binning needs NumPy; totals are still worth keeping
+            return []
+
+    def record_async(self, record):
+        """Store record on a worker thread; close() waits for it."""
+        thread = threading.Thread(target=self._record_logged, args=(record,), name="history-writer", daemon=True)
+        self._writers = [t for t in self._writers if t.is_alive()] + [thread]
+        thread.start()
+
+    def _record_logged(self, record):
+        try:
+            self.record(record)
+        except sqlite3.Error as e:
+            logger.warning("Could not save session to %s: %s", self.path, e)
+
+    def import_csv(self, paths):
+        """Bulk import CSV exports (totals, bins or events) as sessions; return their ids."""
+        return self.record_many([read_csv_export(path) for path in paths])
+
+    # Queries
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def counter_history(self, name, limit=DEFAULT_LIMIT):
+        """(session id, finished_at, session name, count) of counter name in its last limit sessions, newest first."""
+        return self._query(
+            "SELECT t.session_id, t.finished_at, s.name, t.count FROM totals AS t JOIN sessions AS s ON s.id = t.session_id"
+            " WHERE t.counter_name = ? ORDER BY t.finished_at DESC LIMIT ?", (name, limit))
+
+    def sessions(self, limit=DEFAULT_LIMIT, since=None, config=None):
+        """The last limit sessions as dicts, newest first; optionally only since a Unix time or with a config's mapping."""
+        where, params = [], []
+        if since is not None:
+            where.append("finished_at >= ?")
+            params.append(since)
+        if config is not None:
+            where.append("config_hash = ?")
+            params.append(config_hash(config))
+        sql = "SELECT id, finished_at, name, source, duration, elapsed, config_hash FROM sessions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self._query(sql + " ORDER BY finished_at DESC LIMIT ?", (*params, limit))
+        fields = ('id', 'finished_at', 'name', 'source', 'duration', 'elapsed', 'config_hash')
+        return [dict(zip(fields, row)) for row in rows]
+
+    def session_config(self, session_id):
+        rows = self._query("SELECT config FROM sessions WHERE id = ?", (session_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def session_totals(self, session_id):
+        """(key, name, count) of each counter of a session, in display order."""
+        return self._query(
+            "SELECT counter_key, counter_name, count FROM totals WHERE session_id = ? ORDER BY rowid", (session_id,))
+
+    def session_bins(self, session_id, name):
+        """(bin start in seconds, count) of one counter of a session."""
+        return self._query(
+            "SELECT bin_start, count FROM bins WHERE session_id = ? AND counter_name = ? ORDER BY bin_start",
+            (session_id, name))
+
+    def counter_names(self):
+        # Hop from name to name through the index instead of scanning every total
+        return [name for name, in self._query(
+            "WITH RECURSIVE names(name) AS ("
+            " SELECT MIN(counter_name) FROM totals"
+            " UNION ALL SELECT (SELECT MIN(counter_name) FROM totals WHERE counter_name > name) FROM names WHERE name IS NOT NULL)"
+            " SELECT name FROM names WHERE name IS NOT NULL")]
+
+    def delete_session(self, session_id):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def close(self):
+        """Wait for sessions still being written, then close the database."""
+        for thread in self._writers:
+            thread.join()
+        with self._lock:
+            self.db.close()
@@ -0,0 +1,106 @@
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from history import DEFAULT_LIMIT
+
+ALL_SESSIONS = "(all sessions)"
+
+
+class HistoryPanel(tk.Toplevel):
+    """Completed sessions across runs (see history.HistoryStore): one counter's totals or the session list."""
+
+    def __init__(self, parent, store, on_close=None):
+        super().__init__(parent)
+        self.title("History")
+        self.geometry("560x400")
+        self.store = store
+        self.on_close = on_close
+        controls = ttk.Frame(self, padding=5)
+        controls.pack(fill=tk.X)
+        ttk.Label(controls, text="Counter:").pack(side=tk.LEFT)
+        self.counter_var = tk.StringVar(value=ALL_SESSIONS)
+        self.counter_box = ttk.Combobox(controls, textvariable=self.counter_var, state='readonly', width=24)
+        self.counter_box.pack(side=tk.LEFT, padx=5)
+        self.counter_box.bind("<<ComboboxSelected>>", self.refresh)
+        ttk.Label(controls, text="Last:").pack(side=tk.LEFT)
+        self.limit_entry = ttk.Entry(controls, width=6)
+        self.limit_entry.insert(0, str(DEFAULT_LIMIT))
+        self.limit_entry.pack(side=tk.LEFT, padx=5)
+        self.limit_entry.bind("<Return>", self.refresh)
+        ttk.Button(controls, text="Import CSV...", command=self.import_csv).pack(side=tk.RIGHT)
+        self.tree = ttk.Treeview(self, columns=('finished', 'session', 'value'), show='headings')
+        self.tree.heading('finished', text='Finished')
+        self.tree.heading('session', text='Session')
+        self.tree.column('finished', width=150)
+        self.tree.column('value', width=90, anchor='e')
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.status = ttk.Label(self, padding=5)
+        self.status.pack(fill=tk.X)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def limit(self):
+        try:
+            return max(1, int(self.limit_entry.get()))
+        except ValueError:
+            return DEFAULT_LIMIT
+
+    def refresh(self, event=None):
+        self.counter_box['values'] = [ALL_SESSIONS, *self.store.counter_names()]
+        name = self.counter_var.get()
+        started = time.perf_counter()
+        if name == ALL_SESSIONS:
+            self.tree.heading('value', text='Elapsed (s)')
+            sessions = self.store.sessions(self.limit())
+            rows = [(s['finished_at'], f"{s['name']} ({s['source']})", '' if s['elapsed'] is None else f"{s['elapsed']:.0f}")
+                    for s in sessions]
+            summary = f"{len(rows)} sessions"
+        else:
+            self.tree.heading('value', text='Count')
+            history = self.store.counter_history(name, self.limit())
+            rows = [(finished_at, session, count) for _, finished_at, session, count in history]
+            total = sum(count for *_, count in history)
+            mean = total / len(history) if history else 0
+            summary = f"{name}: {len(history)} sessions, total {total}, mean {mean:.1f}"
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.tree.delete(*self.tree.get_children())
+        for finished_at, session, value in rows:
+            self.tree.insert('', tk.END, values=(time.strftime('%Y-%m-%d %H:%M', time.localtime(finished_at)), session, value))
+        self.status.config(text=f"{summary} ({elapsed_ms:.1f} ms)")
+
+    def import_csv(self):
+        """Import CSV exports as past sessions on a worker thread."""
+        from tkinter import filedialog
+        paths = filedialog.askopenfilenames(parent=self, filetypes=[("CSV exports", "*.csv")])
+        if not paths:
+            return
+        result = {}
+
+        def run():
+            try:
+                result['ids'] = self.store.import_csv(paths)
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=run, name="history-import", daemon=True)
+        thread.start()
+        self.status.config(text=f"Importing {len(paths)} files...")
+        self.after(100, self.poll_import, thread, result)
+
+    def poll_import(self, thread, result):
+        if not self.winfo_exists():
+            return
+        if thread.is_alive():
+            self.after(100, self.poll_import, thread, result)
+        elif 'error' in result:
+            self.status.config(text=f"Import failed: {result['error']}")
+        else:
+            self.refresh()
+            self.status.config(text=f"Imported {len(result['ids'])} sessions")
+
+    def close(self):
+        self.destroy()
+        if self.on_close is not None:
+            self.on_close()
@@ -0,0 +1,270 @@
+import asyncio
+import collections
+import os
+import struct
+import threading
+
+from registry import normalize_key
+
+DEFAULT_HOST = '127.0.0.1'  # Only local clients unless a host is given explicitly
+READ_SIZE = 65536
+QUEUE_KEYS = 1_000_000  # Presses waiting for the UI before readers are paused
+DRAIN_KEYS = 10_000  # Presses applied per drain, so a flood cannot stall the event loop
+MAX_LINE = 256  # A longer line means the client is not speaking the protocol
+MAX_COUNT = 65535  # Largest count in one message, the same for both protocols
+
+# Binary protocol: the stream starts with MAGIC, then each record is
+# RECORD (key length, count) followed by the UTF-8 key.
+MAGIC = b'ATCI'
+RECORD = struct.Struct('<BH')
+
+
+class Decoder:
+    """Turns the bytes of one stream into (counter key, count) pairs.
+
+    A stream that starts with MAGIC is binary; anything else is the line
+    protocol, one ``KEY [COUNT]`` per line (``A``, ``CONTROL-A 5``). Keys are
+    normalized like keys typed into the app. Counts are kept as they are, so
+    a few bytes asking for thousands of presses stay a few bytes in memory.
+    """
+
+    def __init__(self):
+        self.buffer = b''
+        self.binary = None  # Unknown until the first bytes arrive
+        self._keys = {}  # raw key bytes -> normalized key
+
+    def key(self, raw):
+        key = self._keys.get(raw)
+        if key is None:
+            key = self._keys[raw] = normalize_key(raw.decode('utf-8', 'replace'))
+        return key
+
+    def feed(self, data):
+        """Return the (key, count) pairs of every complete message in data plus what was buffered before it."""
+        buffer = self.buffer + data if self.buffer else data
+        if self.binary is None:
+            if len(buffer) < len(MAGIC) and MAGIC.startswith(buffer):
+                self.buffer = buffer
+                return []
+            self.binary = buffer.startswith(MAGIC)
+            if self.binary:
+                buffer = buffer[len(MAGIC):]
+        counts = []
+        if self.binary:
+            offset = self._parse_binary(buffer, counts)
+            self.buffer = buffer[offset:]
+        else:
+            self.buffer = self._parse_lines(buffer, counts)
+            if len(self.buffer) > MAX_LINE:
+                raise ValueError("Line too long for the ingest protocol.")
+        return counts
+
+    def _parse_lines(self, buffer, counts):
+        *lines, rest = buffer.split(b'\n')
+        key = self.key
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) == 1:
+                counts.append((key(parts[0]), 1))
+                continue
+            try:
+                count = int(parts[1])
+            except ValueError:
+                continue  # Skip the malformed line, keep the stream
+            if 0 < count <= MAX_COUNT:
+                counts.append((key(parts[0]), count))
+        return rest
+
+    def _parse_binary(self, buffer, counts):
+        unpack, size, key = RECORD.unpack_from, RECORD.size, self.key
+        offset, end = 0, len(buffer)
+        while offset + size <= end:
+            length, count = unpack(buffer, offset)
+            stop = offset + size + length
+            if stop > end:
+                break
+            if count:
+                counts.append((key(buffer[offset + size:stop]), count))
+            offset = stop
+        return offset
+
+
+def decode(data):
+    """(key, count) pairs of one self-contained message, such as a UDP datagram."""
+    decoder = Decoder()
+    counts = decoder.feed(data)
+    if decoder.buffer and not decoder.binary:
+        counts += decoder.feed(b'\n')  # The last line of a datagram needs no newline
+    return counts
+
+
+def encode_binary(counts):
+    """Encode (key, count) pairs as a binary protocol stream; for clients and tests."""
+    parts = [MAGIC]
+    for key, count in counts:
+        raw = key.encode('utf-8')
+        parts.append(RECORD.pack(len(raw), count))
+        parts.append(raw)
+    return b''.join(parts)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        try:
+            counts = decode(data)
+        except ValueError:
+            return
+        if counts:
+            self.server.offer(counts)
+
+
+class IngestServer:
+    """Accepts increments from local clients on an asyncio loop in a background thread.
+
+    Clients connect over TCP, a Unix domain socket or UDP and send messages
+    in the line or binary protocol (see Decoder). Every read becomes
+    (key, count) pairs on a thread-safe queue, which the UI applies with
+    ``drain`` from its own event loop, at most ``DRAIN_KEYS`` presses at a
+    time. The queue is bounded by the presses it holds, not by reads: once
+    ``max_keys`` are waiting, stream readers stop reading until there is
+    room again, so fast clients are held back by their socket buffers
+    instead of growing memory; UDP has no such feedback, so datagrams that
+    do not fit are dropped and counted.
+    """
+
+    def __init__(self, tcp_port=None, udp_port=None, unix_path=None, host=DEFAULT_HOST, max_keys=QUEUE_KEYS):
+        if tcp_port is None and udp_port is None and unix_path is None:
+            raise ValueError("The ingest server needs a TCP port, a UDP port or a Unix socket path.")
+        self.tcp_port = tcp_port
+        self.udp_port = udp_port
+        self.unix_path = unix_path
+        self.host = host
+        self.max_keys = max_keys
+        self.pending = 0  # Presses queued and not drained yet
+        self.received = 0  # Presses queued for the UI
+        self.dropped = 0  # Presses of UDP datagrams that found the queue full
+        self._queue = collections.deque()  # [key, count] pairs, oldest first
+        self._lock = threading.Lock()
+        self.addresses = []  # Bound (kind, address) pairs once started
+        self.error = None
+        self._ready = threading.Event()
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """Bind every endpoint and start serving; raise OSError if one cannot be bound."""
+        self._thread = threading.Thread(target=self._run, name="ingest-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            self._thread.join()
+            raise self.error
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            try:
+                servers = loop.run_until_complete(self._serve())
+            except OSError as e:
+                self.error = e
+                return
+            finally:
+                self._ready.set()
+            loop.run_forever()
+            for server in servers:
+                server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        servers = []
+        if self.tcp_port is not None:
+            server = await asyncio.start_server(self._handle_stream, self.host, self.tcp_port)
+            servers.append(server)
+            self.addresses.append(('tcp', server.sockets[0].getsockname()[:2]))
+        if self.unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle_stream, path=self.unix_path)
+            servers.append(server)
+            self.addresses.append(('unix', self.unix_path))
+        if self.udp_port is not None:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(self.host, self.udp_port))
+            servers.append(transport)
+            self.addresses.append(('udp', transport.get_extra_info('sockname')[:2]))
+        return servers
+
+    async def _handle_stream(self, reader, writer):
+        decoder = Decoder()
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                counts = decoder.feed(data)
+                if counts:
+                    await self._put(counts)
+        except (ValueError, ConnectionError):
+            pass  # Drop a client that breaks the protocol or goes away
+        finally:
+            writer.close()
+
+    def _try_put(self, counts, presses):
+        with self._lock:
+            # A read is taken whole once the queue has room, so one larger than max_keys cannot wait forever
+            if self.pending and self.pending + presses > self.max_keys:
+                return False
+            self._queue.extend([key, count] for key, count in counts)
+            self.pending += presses
+            self.received += presses
+            return True
+
+    async def _put(self, counts):
+        """Queue (key, count) pairs, waiting (without reading more) while the UI is behind."""
+        presses = sum(count for _, count in counts)
+        delay = 0.001
+        while not self._try_put(counts, presses):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def offer(self, counts):
+        """Queue (key, count) pairs unless the queue is full; for sources that cannot wait."""
+        presses = sum(count for _, count in counts)
+        if not self._try_put(counts, presses):
+            self.dropped += presses
+
+    def drain(self, max_keys=DRAIN_KEYS):
+        """Return up to max_keys queued presses as a list of keys, oldest first."""
+        keys = []
+        with self._lock:
+            pending = self._queue
+            room = max_keys
+            while pending and room:
+                entry = pending[0]
+                key, count = entry
+                if count > room:
+                    entry[1] = count - room  # The rest stays queued for the next drain
+                    count = room
+                else:
+                    pending.popleft()
+                keys += [key] * count
+                room -= count
+            self.pending -= len(keys)
+        return keys
+
+    def close(self):
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        if self.unix_path is not None and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
@@ -0,0 +1,157 @@
+import collections
+import os
+import struct
+import threading
+import time
+
+from metrics import NULL_METRICS
+from registry import MAX_KEY_BYTES
+
+# File layout: an 8 byte header followed by fixed-width little-endian records
+# of (session time in ns, counter slot, key as up to KEY_BYTES UTF-8 bytes).
+# Keys are never cut: the registry rejects longer ones. Version 1 journals
+# had 24 byte keys; they are still read and appended to.
+MAGIC = b'ATCJ'
+VERSION = 2
+HEADER = struct.Struct('<4sHH')  # magic, version, record size
+KEY_BYTES = MAX_KEY_BYTES
+RECORD = struct.Struct(f'<qI{KEY_BYTES}s')
+RECORDS = {1: struct.Struct('<qI24s'), VERSION: RECORD}  # Record layout of each version
+
+DEFAULT_FLUSH_INTERVAL = 0.5  # Seconds; a crash loses at most this much input
+
+
+class JournalWriter:
+    """Append-only binary journal written in batches by a background thread.
+
+    ``append`` only pushes a tuple onto a deque, so the cost on the UI
+    thread is constant. The writer thread packs whatever has accumulated
+    every ``flush_interval`` seconds, writes it in one call and fsyncs.
+    ``written`` counts the records in the file, appended ones only once
+    they are fsynced.
+    """
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, metrics=NULL_METRICS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.metrics = metrics
+        self._pending = collections.deque()
+        self._key_bytes = {}
+        self._closed = threading.Event()
+        self._written_cond = threading.Condition()
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        # A recovered run keeps appending in the layout its journal was started with
+        self.record = read_layout(path) if size >= HEADER.size else RECORD
+        self._file = open(path, 'ab')
+        if size < HEADER.size:
+            # Empty, or the header itself was torn by a crash
+            self._file.truncate(0)
+            size = 0
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._file.flush()
+        elif (size - HEADER.size) % self.record.size:
+            # Drop a record torn by a crash so appended records stay aligned
+            self._file.truncate(size - (size - HEADER.size) % self.record.size)
+        self.written = max(0, size - HEADER.size) // self.record.size
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, t_ns, slot, key):
+        self._pending.append((t_ns, slot, key))
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write all pending records and fsync; called from the writer thread."""
+        if not self._pending:
+            return
+        timed = self.metrics.enabled
+        if timed:
+            start = time.perf_counter()
+            self.metrics.set('journal_pending_records', "Records waiting for the journal writer", len(self._pending))
+        pending, pack, key_bytes = self._pending, self.record.pack, self._key_bytes
+        chunk = []
+        while pending:
+            t_ns, slot, key = pending.popleft()
+            encoded = key_bytes.get(key)
+            if encoded is None:
+                encoded = key_bytes[key] = key.encode('utf-8')
+            chunk.append(pack(t_ns, slot, encoded))
+        self._file.write(b''.join(chunk))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        with self._written_cond:
+            self.written += len(chunk)
+            self._written_cond.notify_all()
+        if timed:
+            self.metrics.observe('journal_flush_seconds', time.perf_counter() - start)
+
+    def wait_written(self, count, timeout=None):
+        """Wait until the file holds count records; return False on timeout or if it never will."""
+        with self._written_cond:
+            return self._written_cond.wait_for(
+                lambda: self.written >= count or not self._thread.is_alive(), timeout) and self.written >= count
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self._file.close()
+        with self._written_cond:
+            self._written_cond.notify_all()
+
+
+def _layout(f, path):
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a counter journal (header is {len(header)} bytes)")
+    magic, version, record_size = HEADER.unpack(header)
+    record = RECORDS.get(version)
+    if magic != MAGIC or record is None or record_size != record.size:
+        raise ValueError(f"{path} is not a counter journal")
+    return record
+
+
+def read_layout(path):
+    """The record struct of the journal at path; raises ValueError if it has no valid header."""
+    with open(path, 'rb') as f:
+        return _layout(f, path)
+
+
+def read_events(path, offset=0):
+    """Yield (t_ns, slot, key) for each complete record, skipping the first offset records.
+
+    A partially written record at the end of the file (after a crash) is
+    ignored. Raises ValueError if path does not start with a journal header.
+    """
+    with open(path, 'rb') as f:
+        record = _layout(f, path)
+        f.seek(HEADER.size + offset * record.size)
+        keys = {}
+        while True:
+            data = f.read(record.size * 4096)
+            usable = len(data) - len(data) % record.size
+            for t_ns, slot, raw_key in record.iter_unpack(data[:usable]):
+                key = keys.get(raw_key)
+                if key is None:
+                    key = keys[raw_key] = raw_key.rstrip(b'\0').decode('utf-8', 'replace')
+                yield t_ns, slot, key
+            if len(data) < record.size * 4096:
+                break
+
+
+def record_count(path):
+    """Number of complete records in the journal at path."""
+    return max(0, os.path.getsize(path) - HEADER.size) // read_layout(path).size
+
+
+def read_totals(path):
+    """Rebuild the per-key totals from a journal."""
+    totals = collections.Counter()
+    for _, _, key in read_events(path):
+        totals[key] += 1
+    return dict(totals)
@@ -0,0 +1,85 @@
+import time
+
+from metrics import NULL_METRICS
+from registry import MODIFIER_KEYSYMS, SEQUENCE_SEPARATOR
+
+DEFAULT_SEQUENCE_TIMEOUT = 1.0  # Seconds allowed between the chords of a sequence
+
+
+class InputEngine:
+    """Turns chords from key events into counter keys.
+
+    Bindings come from a registry and are compiled into a trie of dicts:
+    a plain key or chord ("A", "CONTROL-A") maps straight to its counter
+    key; a sequence ("CONTROL-K C") maps its first chords to nested dicts.
+    Each press is a single dict lookup however many bindings there are.
+    When a sequence starts with a chord that is bound on its own, the
+    shorter binding wins.
+
+    Counters with a debounce window (``debounce_ms``) ignore presses that
+    come sooner than that after the last accepted one; such rejected
+    bounces are counted in metrics.
+    """
+
+    def __init__(self, counters, sequence_timeout=DEFAULT_SEQUENCE_TIMEOUT, clock=time.monotonic_ns, metrics=NULL_METRICS):
+        self.counters = counters  # registry.CounterRegistry
+        self.timeout_ns = int(sequence_timeout * 1e9)
+        self.clock = clock
+        self.metrics = metrics
+        self.table = {}  # chord -> counter key, or dict for the rest of a sequence
+        self.debounce_ns = {}  # counter key -> window, only for counters that have one
+        self.last_ns = {}  # counter key -> time of the last accepted press
+        self._node = None  # Trie node of the sequence in progress
+        self._node_ns = 0
+        self.compile()
+
+    def compile(self):
+        """Rebuild the lookup table; call after counters are added, removed or reloaded."""
+        table = {}
+        bindings = sorted(self.counters.index, key=lambda key: key.count(SEQUENCE_SEPARATOR))
+        for key in bindings:  # Shortest first, so a shorter binding shadows the sequences it starts
+            *prefix, last = key.split(SEQUENCE_SEPARATOR)
+            node = table
+            for chord in prefix:
+                node = node.setdefault(chord, {})
+                if not isinstance(node, dict):
+                    break
+            else:
+                node.setdefault(last, key)
+        counters = self.counters
+        self.table = table
+        self.debounce_ns = {
+            key: int(counters.debounce[slot] * 1e6) for key, slot in counters.index.items() if counters.debounce[slot]
+        }
+        self.last_ns = {}
+        self._node = None
+
+    def press(self, chord):
+        """Return the counter key completed by chord, or None (unbound, sequence prefix or bounce)."""
+        now = self.clock()
+        node = self._node
+        if node is not None and now - self._node_ns > self.timeout_ns:
+            node = None
+        target = node.get(chord) if node is not None else None
+        if target is None:
+            if node is not None and chord in MODIFIER_KEYSYMS:
+                return None  # Reaching for Control mid-sequence does not break it
+            target = self.table.get(chord)  # Not a continuation; maybe the start of something else
+        if type(target) is dict:
+            self._node, self._node_ns = target, now
+            return None
+        self._node = None
+        if target is None:
+            return None
+        window = self.debounce_ns.get(target)
+        if window:
+            if now - self.last_ns.get(target, -window) < window:
+                self.metrics.inc('bounces_rejected_total', "Presses rejected by a debounce window")
+                return None
+            self.last_ns[target] = now
+        return target
+
+    def reset(self):
+        """Forget a sequence in progress and the debounce history, e.g. at the start of a run."""
+        self._node = None
+        self.last_ns = {}
@@ -0,0 +1,125 @@
+import bisect
+import json
+import os
+import threading
+
+# Upper bounds in seconds, from 0.1 ms to 1 s; suits everything timed on or off the UI thread
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+PREFIX = 'counter_'  # Namespace of the exported metric names
+
+
+class Histogram:
+    """Bucketed distribution of observations (Prometheus semantics: cumulative on export)."""
+
+    __slots__ = ('help', 'buckets', 'counts', 'count', 'sum', 'max', '_lock')
+
+    def __init__(self, help_text, buckets=DEFAULT_BUCKETS):
+        self.help = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()  # Observed from worker threads too
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q; an estimate, good to one bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts)),
+        }
+
+
+class Metrics:
+    """Opt-in counters, gauges and histograms for diagnosing lag.
+
+    Everything is a no-op while ``enabled`` is False, and call sites that
+    need a clock check ``enabled`` first, so disabled instrumentation costs
+    one attribute test.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}  # name -> (help, value)
+        self.gauges = {}  # name -> (help, value)
+        self.histograms = {
+            'event_loop_lag_seconds': Histogram("Delay of after() callbacks past their scheduled time"),
+            'keypress_seconds': Histogram("Time to handle one keypress"),
+            'redraw_seconds': Histogram("Time to apply one frame of widget updates"),
+            'journal_flush_seconds': Histogram("Time to write and fsync one journal batch"),
+        }
+
+    def inc(self, name, help_text, amount=1):
+        if self.enabled:
+            value = self.counters.get(name, (help_text, 0))[1]
+            self.counters[name] = (help_text, value + amount)
+
+    def set(self, name, help_text, value):
+        if self.enabled:
+            self.gauges[name] = (help_text, value)
+
+    def observe(self, name, value):
+        if self.enabled:
+            self.histograms[name].observe(value)
+
+    def snapshot(self):
+        # list() copies atomically; worker threads may add a metric meanwhile
+        return {
+            'counters': {name: value for name, (_, value) in list(self.counters.items())},
+            'gauges': {name: value for name, (_, value) in list(self.gauges.items())},
+            'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+        }
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+            for name, (help_text, value) in sorted(list(metrics.items())):
+                lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}",
+                          f"{PREFIX}{name} {value}"]
+        for name, histogram in sorted(self.histograms.items()):
+            lines += [f"# HELP {PREFIX}{name} {histogram.help}", f"# TYPE {PREFIX}{name} histogram"]
+            cumulative = 0
+            for bound, count in zip([*map(str, histogram.buckets), '+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{PREFIX}{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines += [f"{PREFIX}{name}_sum {histogram.sum}", f"{PREFIX}{name}_count {histogram.count}"]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Atomically write the metrics to path: JSON for a .json file, Prometheus text otherwise."""
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+NULL_METRICS = Metrics()  # Shared disabled instance for components created without metrics
@@ -0,0 +1,104 @@
+import logging
+import platform
+import queue
+import threading
+
+logger = logging.getLogger("counter")
+
+# (frequency Hz, duration ms) per notification type for winsound.Beep
+TONES = {'info': (500, 300), 'warning': (1000, 300), 'error': (1000, 500)}
+
+
+class NullNotifier:
+    """Drops every notification; for headless and benchmark runs."""
+
+    def notify(self, message, type_="info"):
+        pass
+
+    def close(self):
+        pass
+
+
+class LogNotifier(NullNotifier):
+    """Writes notifications to the 'counter' logger."""
+
+    LEVELS = {'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+    def notify(self, message, type_="info"):
+        logger.log(self.LEVELS.get(type_, logging.INFO), message)
+
+
+class SoundNotifier(NullNotifier):
+    """Plays a tone per notification on a worker thread so the caller never waits for it.
+
+    On Windows the tone comes from winsound; elsewhere ``fallback`` (for
+    example a Tk widget's ``bell``, which returns immediately) is called
+    on the caller's thread instead.
+    """
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback
+        self._queue = None
+        if platform.system() == "Windows":
+            self._queue = queue.Queue(maxsize=4)  # Excess sounds are dropped rather than queued up
+            threading.Thread(target=self._run, name="notification-sound", daemon=True).start()
+
+    def notify(self, message, type_="info"):
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(type_)
+            except queue.Full:
+                pass
+        elif self.fallback is not None:
+            self.fallback()
+
+    def _run(self):
+        import winsound  # Windows only, so imported where it is used
+        while True:
+            type_ = self._queue.get()
+            if type_ is None:
+                return
+            winsound.Beep(*TONES.get(type_, TONES['info']))
+
+    def close(self):
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+
+class StatusBarNotifier(NullNotifier):
+    """Shows the message in a label (a non-modal toast) and clears it after ``timeout_ms``."""
+
+    COLORS = {'info': '', 'warning': 'dark orange', 'error': 'red'}
+
+    def __init__(self, label, timeout_ms=4000):
+        self.label = label
+        self.timeout_ms = timeout_ms
+        self._clear_job = None
+
+    def notify(self, message, type_="info"):
+        if self._clear_job is not None:
+            self.label.after_cancel(self._clear_job)
+        self.label.config(text=message, foreground=self.COLORS.get(type_, ''))
+        self._clear_job = self.label.after(self.timeout_ms, self._clear)
+
+    def _clear(self):
+        self._clear_job = None
+        self.label.config(text="")
+
+
+class MultiNotifier(NullNotifier):
+    """Sends each notification to several backends."""
+
+    def __init__(self, *notifiers):
+        self.notifiers = notifiers
+
+    def notify(self, message, type_="info"):
+        for notifier in self.notifiers:
+            notifier.notify(message, type_)
+
+    def close(self):
+        for notifier in self.notifiers:
+            notifier.close()
@@ -0,0 +1,36 @@
+import os
+import platform
+
+
+def data_dir():
+    """Per-user directory for session data (journals), created on first use."""
+    system = platform.system()
+    if system == "Windows":
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif system == "Darwin":
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    path = os.path.join(base, 'AdvancedCounter')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def sessions_dir():
+    path = os.path.join(data_dir(), 'sessions')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def config_dir():
+    """Per-user directory for the persisted configuration, created on first use."""
+    system = platform.system()
+    if system == "Windows":
+        return data_dir()  # %APPDATA% is already the roaming config location
+    if system == "Darwin":
+        base = os.path.expanduser('~/Library/Preferences')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    path = os.path.join(base, 'AdvancedCounter')
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from paths import config_dir
+from registry import MAX_KEY_BYTES, normalize_key
+
+CONFIG_VERSION = 1
+CONFIG_NAME = 'config.json'
+LEGACY_CONFIG_PATH = 'config.json'  # Older versions wrote the config to the working directory
+DEFAULT_DEBOUNCE = 0.5  # Seconds of quiet before a burst of edits is written
+
+logger = logging.getLogger("counter")
+
+
+def default_config_path():
+    return os.path.join(config_dir(), CONFIG_NAME)
+
+
+def atomic_write_json(path, data):
+    """Replace path with data without ever leaving a truncated file (temp file + fsync + rename)."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def migrate(config):
+    """Bring a config of any known schema version up to CONFIG_VERSION."""
+    if not isinstance(config, dict):
+        raise ValueError("Config must be a JSON object.")
+    version = config.get('version', 0)
+    if version > CONFIG_VERSION:
+        raise ValueError(f"Config version {version} is newer than this app supports ({CONFIG_VERSION}).")
+    if version == 0:
+        # Unversioned files: keys were typed freely, normalize them as the registry does
+        config = {
+            'version': 1,
+            'counters': [{'key': normalize_key(c['key']), 'name': c['name']} for c in config.get('counters', [])],
+            'duration': config.get('duration', 900),
+        }
+    # Keys are compared in registry form, so "a" and "A" are caught as duplicates by validate()
+    counters = config.get('counters')
+    if isinstance(counters, list):
+        config = dict(config, counters=[
+            dict(c, key=normalize_key(c['key'])) if isinstance(c, dict) and isinstance(c.get('key'), str) else c
+            for c in counters])
+    return config
+
+
+def validate(config):
+    """Raise ValueError describing the first problem in a migrated config."""
+    counters = config.get('counters')
+    if not isinstance(counters, list):
+        raise ValueError("'counters' must be a list.")
+    seen = set()
+    for c in counters:
+        if not isinstance(c, dict) or not isinstance(c.get('key'), str) or not isinstance(c.get('name'), str):
+            raise ValueError("Each counter needs a string 'key' and 'name'.")
+        if not c['key']:
+            raise ValueError("Counter keys cannot be empty.")
+        if len(c['key'].encode('utf-8')) > MAX_KEY_BYTES:
+            raise ValueError(f"Key {c['key']} is longer than {MAX_KEY_BYTES} bytes.")
+        if c['key'] in seen:
+            raise ValueError(f"Key {c['key']} is used by more than one counter.")
+        seen.add(c['key'])
+        debounce = c.get('debounce_ms', 0)
+        if isinstance(debounce, bool) or not isinstance(debounce, (int, float)) or debounce < 0:
+            raise ValueError(f"'debounce_ms' of {c['key']} must be a non-negative number of milliseconds.")
+    duration = config.get('duration')
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+        raise ValueError("'duration' must be a positive number of seconds.")
+    memory_limit = config.get('memory_limit_mb')
+    if memory_limit is not None and (isinstance(memory_limit, bool) or not isinstance(memory_limit, (int, float))
+                                     or memory_limit <= 0):
+        raise ValueError("'memory_limit_mb' must be a positive number of megabytes.")
+    return config
+
+
+def read_config(path):
+    """Load, migrate and validate the config at path."""
+    with open(path) as f:
+        config = json.load(f)
+    try:
+        return validate(migrate(config))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed config {path}: {e!r}") from None
+
+
+def versioned(config):
+    return dict(config, version=CONFIG_VERSION)
+
+
+class ConfigStore:
+    """Debounced background persistence of the app config.
+
+    ``save`` only records the latest config; a worker thread writes it once
+    no further save has arrived for ``debounce`` seconds, so a burst of
+    edits costs a single atomic write off the UI thread.
+    """
+
+    def __init__(self, path=None, debounce=DEFAULT_DEBOUNCE):
+        self.path = path or default_config_path()
+        self.debounce = debounce
+        self._pending = None
+        self._deadline = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+        self._thread.start()
+
+    def load(self):
+        """Return the stored config, falling back to a legacy ./config.json; None if there is none."""
+        for path in (self.path, LEGACY_CONFIG_PATH):
+            if os.path.exists(path):
+                return read_config(path)
+        return None
+
+    def save(self, config):
+        with self._cond:
+            self._pending = versioned(config)
+            self._deadline = time.monotonic() + self.debounce
+            self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                delay = self._deadline - time.monotonic()
+                if delay > 0 and not self._closed:
+                    self._cond.wait(delay)
+                    continue
+                config, self._pending = self._pending, None
+                self._cond.release()
+                try:
+                    atomic_write_json(self.path, config)
+                except OSError as e:
+                    logger.warning("Could not save config to %s: %s", self.path, e)
+                finally:
+                    self._cond.acquire()
+
+    def close(self):
+        """Write any pending config now and stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
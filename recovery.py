@@ -0,0 +1,138 @@
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+from events import EventLog
+from journal import read_events, record_count
+from persistence import atomic_write_json
+
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_VERSION = 1
+INTERRUPTED_STATES = ('running', 'paused')
+JOURNAL_MAX_AGE_DAYS = 30  # Journals of finished runs are kept this long for replay
+
+_write_lock = threading.Lock()
+_last_written = {}  # path -> 'taken_ns' of the newest snapshot written there
+
+
+def snapshot_path(journal_path):
+    return journal_path + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(path, snapshot):
+    """Atomically replace path with snapshot (temp file + fsync + rename).
+
+    Safe to call from several threads: a snapshot older than the one
+    already on disk is dropped instead of overwriting it.
+    """
+    with _write_lock:
+        if snapshot['taken_ns'] < _last_written.get(path, -1):
+            return
+        atomic_write_json(path, snapshot)
+        _last_written[path] = snapshot['taken_ns']
+
+
+def write_snapshot_async(path, snapshot, journal=None):
+    """Write snapshot on a worker thread, once journal (if given) holds the records it counts."""
+    def run():
+        if journal is None or journal.wait_written(snapshot['events']):
+            write_snapshot(path, snapshot)
+    threading.Thread(target=run, name="snapshot-writer", daemon=True).start()
+
+
+def discard_snapshot(path):
+    """Delete the snapshot at path once its run is over; snapshots still being written there are dropped."""
+    with _write_lock:
+        _last_written[path] = math.inf
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def read_snapshot(path):
+    with open(path) as f:
+        snapshot = json.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version in {path}")
+    return snapshot
+
+
+def find_all_interrupted(directory):
+    """Return the snapshot paths of every session that never finished, newest first.
+
+    Finished runs delete their snapshot, so only crashed or closed runs are
+    left to read; a finished one left by an older version is deleted here.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, '*' + SNAPSHOT_SUFFIX)), key=os.path.getmtime, reverse=True)
+    interrupted = []
+    for path in paths:
+        try:
+            if read_snapshot(path)['state'] in INTERRUPTED_STATES:
+                interrupted.append(path)
+            else:
+                discard_snapshot(path)
+        except (OSError, ValueError, KeyError):
+            continue
+    return interrupted
+
+
+def prune_journals(directory, max_age_days=JOURNAL_MAX_AGE_DAYS):
+    """Delete the journals of finished runs not modified for max_age_days; return how many were deleted.
+
+    A journal with a snapshot next to it belongs to a run that can still be
+    recovered and is kept whatever its age.
+    """
+    cutoff = time.time() - max_age_days * 86400
+    deleted = 0
+    for path in glob.glob(os.path.join(directory, '*.journal')):
+        try:
+            if os.path.getmtime(path) < cutoff and not os.path.exists(snapshot_path(path)):
+                os.remove(path)
+                deleted += 1
+        except OSError:
+            continue
+    return deleted
+
+
+def find_interrupted(directory):
+    """Return the snapshot path of the newest session that never finished, or None."""
+    interrupted = find_all_interrupted(directory)
+    return interrupted[0] if interrupted else None
+
+
+def recover(engine, path):
+    """Restore engine from the snapshot at path plus the journal tail written after it.
+
+    Only the tail is replayed, so this takes milliseconds however long the
+    session was. Returns the snapshot; the events before it can be loaded
+    afterwards with load_event_history().
+    """
+    snapshot = read_snapshot(path)
+    journal_path = snapshot['journal']
+    exists = os.path.exists(journal_path)
+    tail = list(read_events(journal_path, offset=snapshot['events'])) if exists else []
+    engine.restore(snapshot, tail)
+    # New records are appended after the ones on disk, whatever the snapshot counted
+    engine.journal_records = record_count(journal_path) if exists else 0
+    return snapshot
+
+
+def load_event_history(journal_path, index, count, history=None):
+    """Read the first count journal records into an EventLog, mapping keys to slots through index.
+
+    Meant to run off the UI thread; pass a copy of the registry index, and
+    the engine's new_event_log() as history for a long run.
+    """
+    history = EventLog() if history is None else history
+    append = history.append
+    for i, (t_ns, _, key) in enumerate(read_events(journal_path)):
+        if i >= count:
+            break
+        slot = index.get(key)
+        if slot is not None:
+            append(t_ns, slot)
+    return history
@@ -0,0 +1,177 @@
+import re
+from array import array
+
+# Tk modifier bits that turn a plain key into a chord such as "CONTROL-A".
+# Lock bits (Shift Lock/CapsLock 0x2, NumLock) are never part of a chord.
+MODIFIER_MASKS = (
+    (0x0004, "CONTROL"),
+    (0x20000, "ALT"),     # Alt on Windows
+)
+# Mod1 is Alt only on X11; Tk on Windows sets it for NumLock
+X11_MODIFIER_MASKS = MODIFIER_MASKS + ((0x0008, "ALT"),)
+MODIFIER_KEYSYMS = {"SHIFT_L", "SHIFT_R", "CONTROL_L", "CONTROL_R", "ALT_L", "ALT_R", "META_L", "META_R"}
+SEQUENCE_SEPARATOR = " "  # Between the chords of a multi-key binding such as "CONTROL-K C"
+MAX_KEY_BYTES = 64  # UTF-8 length of the longest key; every key must fit a journal record whole
+
+
+def normalize_key(key):
+    """Normalize a key name as typed by the user ("a", "f1", "control-a") to its registry form.
+
+    Space-separated chords form a sequence ("control-k c" -> "CONTROL-K C").
+    """
+    return SEQUENCE_SEPARATOR.join(re.sub(r"\s*-\s*", "-", str(key)).upper().split())
+
+
+def windowing_system(widget):
+    """Tk's windowing system ('x11', 'win32' or 'aqua') for widget; decides what the modifier bits mean."""
+    return widget.tk.call('tk', 'windowingsystem')
+
+
+def key_from_event(event, system=None):
+    """Build the registry key for a Tk key event, including Control/Alt chords.
+
+    system is the windowing system (see windowing_system); it is looked up
+    from the event's widget when not given.
+    """
+    key = event.keysym.upper()
+    if key in MODIFIER_KEYSYMS:
+        return key
+    state = getattr(event, "state", 0)
+    if not isinstance(state, int) or not state:
+        return key
+    if system is None:
+        widget = getattr(event, "widget", None)
+        system = windowing_system(widget) if hasattr(widget, "tk") else None
+    prefix = ""
+    for mask, name in X11_MODIFIER_MASKS if system == 'x11' else MODIFIER_MASKS:
+        if state & mask and name not in prefix:
+            prefix += name + "-"
+    return prefix + key
+
+
+class CounterRegistry:
+    """Counters indexed by key, with the counts kept in a flat integer array.
+
+    Each counter owns a slot: ``index`` maps key -> slot and ``counts[slot]``
+    holds its total, so an increment is one dict lookup plus an integer add.
+    ``index`` is insertion ordered and doubles as the display order.
+    ``debounce[slot]`` is the counter's debounce window in milliseconds.
+
+    A removed counter's slot is retired, not freed: events of the current
+    run still refer to it, so it keeps its key and name and is only reused
+    after ``recycle`` (called when a new run starts).
+    """
+
+    __slots__ = ('index', 'counts', 'names', 'keys', 'debounce', '_free', '_retired')
+
+    def __init__(self, counters=()):
+        self.index = {}
+        self.counts = array('q')
+        self.names = []
+        self.keys = []
+        self.debounce = []
+        self._free = []
+        self._retired = []
+        for counter in counters:
+            self.add(counter['key'], counter['name'], counter.get('count', 0), counter.get('debounce_ms', 0))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def add(self, key, name, count=0, debounce_ms=0):
+        """Register a counter and return its slot.
+
+        Raises KeyError if the key is taken and ValueError if it is longer
+        than MAX_KEY_BYTES.
+        """
+        if key in self.index:
+            raise KeyError(key)
+        if len(key.encode('utf-8')) > MAX_KEY_BYTES:
+            raise ValueError(f"Key {key} is longer than {MAX_KEY_BYTES} bytes.")
+        if self._free:
+            slot = self._free.pop()
+            self.keys[slot] = key
+            self.names[slot] = name
+            self.counts[slot] = count
+            self.debounce[slot] = debounce_ms
+        else:
+            slot = len(self.keys)
+            self.keys.append(key)
+            self.names.append(name)
+            self.counts.append(count)
+            self.debounce.append(debounce_ms)
+        self.index[key] = slot
+        return slot
+
+    def remove(self, key):
+        """Unregister a counter; its slot is retired until the next recycle."""
+        slot = self.index.pop(key)
+        self.counts[slot] = 0
+        self.debounce[slot] = 0
+        self._retired.append(slot)
+
+    def recycle(self):
+        """Make retired slots reusable; only when no event refers to them any more."""
+        for slot in self._retired:
+            self.keys[slot] = None
+            self.names[slot] = None
+        self._free.extend(self._retired)
+        self._retired.clear()
+
+    def increment(self, key):
+        """Add one to the counter bound to key; return its slot, or None if unbound."""
+        slot = self.index.get(key)
+        if slot is not None:
+            self.counts[slot] += 1
+        return slot
+
+    def slot(self, key):
+        return self.index.get(key)
+
+    def count(self, key):
+        return self.counts[self.index[key]]
+
+    def name(self, key):
+        return self.names[self.index[key]]
+
+    def reset_counts(self):
+        for slot in range(len(self.counts)):
+            self.counts[slot] = 0
+
+    def clear(self):
+        self.index.clear()
+        self.counts = array('q')
+        self.names.clear()
+        self.keys.clear()
+        self.debounce.clear()
+        self._free.clear()
+        self._retired.clear()
+
+    def items(self):
+        """Yield (key, name, count) in display order."""
+        counts, names = self.counts, self.names
+        for key, slot in self.index.items():
+            yield key, names[slot], counts[slot]
+
+    def to_config(self):
+        """Return the counters in the JSON config layout (counts are not persisted)."""
+        config = []
+        for key, slot in self.index.items():
+            counter = {'key': key, 'name': self.names[slot]}
+            if self.debounce[slot]:
+                counter['debounce_ms'] = self.debounce[slot]
+            config.append(counter)
+        return config
+
+    def load_config(self, counters):
+        """Replace all counters with the ones from a config, counts starting at 0."""
+        for key in list(self.index):
+            self.remove(key)  # Retired, so events of a run in progress keep their counter
+        for c in counters:
+            self.add(normalize_key(c['key']), c['name'], debounce_ms=c.get('debounce_ms', 0))
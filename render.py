@@ -0,0 +1,61 @@
+import time
+
+from metrics import NULL_METRICS
+
+DEFAULT_FPS = 60
+
+
+class RenderScheduler:
+    """Coalesces widget updates and applies them at most once per display frame.
+
+    Views ``mark`` an update (a callback plus its arguments) instead of
+    touching Tk right away. Marking the same update again before the next
+    frame is free, so a burst of presses on one counter costs one label
+    update per frame, however fast the input is. The models themselves are
+    updated immediately; only drawing is deferred.
+    """
+
+    def __init__(self, widget, fps=DEFAULT_FPS, clock=time.monotonic, metrics=NULL_METRICS):
+        self.widget = widget  # Any widget; used for after()
+        self.metrics = metrics
+        self.frame_interval = 1 / fps
+        self.clock = clock
+        self.dirty = {}  # (callback, args) -> None, in marking order
+        self.frames = 0  # Flushes so far
+        self._job = None
+        self._last_flush = 0.0
+
+    def mark(self, callback, *args):
+        """Run callback(*args) in the next frame, once, however often it is marked before then."""
+        self.dirty[(callback, args)] = None
+        if self._job is None:
+            wait = self._last_flush + self.frame_interval - self.clock()
+            self._job = self.widget.after(max(0, round(wait * 1000)), self.flush)
+
+    def discard(self, owner):
+        """Drop the pending updates of owner, e.g. a view that is being destroyed."""
+        for entry in [entry for entry in self.dirty if getattr(entry[0], '__self__', None) is owner]:
+            del self.dirty[entry]
+
+    def flush(self):
+        """Apply every pending update now."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        dirty, self.dirty = self.dirty, {}
+        timed = self.metrics.enabled
+        if timed:
+            start = time.perf_counter()
+        for callback, args in dirty:
+            callback(*args)
+        if timed:
+            self.metrics.observe('redraw_seconds', time.perf_counter() - start)
+            self.metrics.inc('frames_total', "Frames of widget updates applied")
+        self._last_flush = self.clock()
+        self.frames += 1
+
+    def close(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.dirty = {}
@@ -0,0 +1,147 @@
+"""Headless recount of recorded sessions against a config, many files at a time.
+
+    python counter.py replay CONFIG.json SESSION.journal [SESSION.journal ...]
+
+Each recorded session (a journal, or an events export in CSV or JSONL) is
+replayed at its recorded times as fast as it can be read, counted with the
+counters and duration of CONFIG (the schema of Save Config), and its
+totals are written as the same CSV the Save Results as CSV button produces. Files
+are spread over a process pool, one file per task. Pass --speed for
+sessions recorded at another speed, so debounce windows cover the same
+real time as they did live.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import CounterEngine
+from export import DATASETS, ExportSource, export
+from journal import read_events
+from persistence import read_config
+from registry import normalize_key
+
+
+def read_records(path):
+    """Yield (t_ns, slot, key) from a journal or from an events export (.csv or .jsonl).
+
+    Raises ValueError on the first row that is not an event.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, newline='') as f:
+            rows = csv.reader(f)
+            next(rows, None)  # Header
+            for number, row in enumerate(rows, 2):
+                try:
+                    yield int(row[0]), None, normalize_key(row[1])
+                except (IndexError, ValueError):
+                    raise ValueError(f"{path}:{number}: not an event row") from None
+    elif ext == '.jsonl':
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        event = json.loads(line)
+                        yield int(event['time_ns']), None, normalize_key(event['key'])
+                    except (KeyError, TypeError, ValueError):
+                        raise ValueError(f"{path}:{number}: not an event") from None
+    else:
+        yield from read_events(path)
+
+
+def output_path(path, output_dir, dataset):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir or os.path.dirname(path), f"{stem}-{dataset}.csv")
+
+
+def replay_file(path, config, output_dir=None, dataset='totals', speed=1.0):
+    """Replay one recorded session; return its totals and where they were written."""
+    start = time.perf_counter()
+    engine = CounterEngine(config['counters'], config['duration'], memory_limit_mb=config.get('memory_limit_mb'))
+    counted = engine.replay(read_records(path), speed)
+    out = output_path(path, output_dir, dataset)
+    export(ExportSource(engine), dataset, out)
+    return {
+        'file': path,
+        'output': out,
+        'counted': counted,
+        'elapsed': engine.elapsed_time,
+        'seconds': time.perf_counter() - start,
+        'totals': [{'name': r['name'], 'count': r['count']} for r in engine.results()],
+    }
+
+
+def replay_files(paths, config, output_dir=None, dataset='totals', workers=None, speed=1.0):
+    """Yield (path, result, error) for each file as it finishes, using a pool of worker processes.
+
+    A file that cannot be replayed, whatever the reason, is reported with
+    its error and does not stop the others.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            try:
+                yield path, replay_file(path, config, output_dir, dataset, speed), None
+            except Exception as e:
+                yield path, None, e
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {pool.submit(replay_file, path, config, output_dir, dataset, speed): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="counter.py replay", description="Recount recorded sessions with a config.")
+    parser.add_argument('config', help="config JSON, as written by Save Config")
+    parser.add_argument('files', nargs='+', metavar='SESSION', help="journal, or events export (.csv/.jsonl)")
+    parser.add_argument('--duration', type=float, metavar='MIN', help="cut off after this many minutes (default: the config's)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="speed the sessions were recorded at, for debounce windows (default: 1.0)")
+    parser.add_argument('--dataset', choices=DATASETS, default='totals', help="what to write for each session (default: totals)")
+    parser.add_argument('--output-dir', metavar='DIR', help="where to write the CSV files (default: next to each session)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--json', action='store_true', help="print one JSON line per session instead of a table")
+    args = parser.parse_args(argv)
+    try:
+        config = read_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot read the config: {e}")
+    if args.duration is not None:
+        if args.duration <= 0:
+            parser.error("--duration must be positive")
+        config['duration'] = args.duration * 60
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.workers is not None and args.workers <= 0:
+        parser.error("--workers must be positive")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    start = time.perf_counter()
+    for path, result, error in replay_files(args.files, config, args.output_dir, args.dataset, args.workers, args.speed):
+        if error is not None:
+            failed += 1
+            print(f"{path}: {error}", file=sys.stderr)
+        elif args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{path}: {result['counted']} presses in {result['elapsed']:.1f} s -> {result['output']}")
+            for total in result['totals']:
+                print(f"  {total['name']:<30} {total['count']:>10}")
+    if not args.json:
+        print(f"{len(args.files) - failed} of {len(args.files)} sessions replayed in {time.perf_counter() - start:.2f} s",
+              file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from engine import CounterEngine, RUNNING
+
+
+class Session:
+    """One counting station: a name plus its own engine (counters, timer, journal)."""
+
+    __slots__ = ('id', 'name', 'engine')
+
+    def __init__(self, session_id, name, engine):
+        self.id = session_id
+        self.name = name
+        self.engine = engine
+
+
+class SessionManager:
+    """Hosts any number of independent sessions in one process.
+
+    All sessions share a single scheduler: ``next_wakeup_ms`` is the
+    earliest wakeup any running session needs and ``tick`` advances every
+    running session at once, so N sessions cost one timer, not N.
+    """
+
+    def __init__(self):
+        self.sessions = {}  # id -> Session, in creation order
+        self._next_id = 1
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def create(self, name=None, config=None):
+        """Create a session, optionally with the counters and duration of a config."""
+        session_id = self._next_id
+        self._next_id += 1
+        engine = CounterEngine()
+        if config is not None:
+            engine.load_counters(config['counters'])
+            engine.duration = config['duration']
+            engine.memory_limit_mb = config.get('memory_limit_mb')
+        session = Session(session_id, name or f"Session {session_id}", engine)
+        self.sessions[session_id] = session
+        return session
+
+    def close(self, session_id):
+        """Stop the session's run, if any, and forget it."""
+        session = self.sessions.pop(session_id)
+        session.engine.stop()
+        session.engine.close_journal()
+        return session
+
+    def close_all(self):
+        for session_id in list(self.sessions):
+            self.close(session_id)
+
+    def running(self):
+        return [session for session in self.sessions.values() if session.engine.state == RUNNING]
+
+    def tick(self):
+        """Advance every running session; return the sessions that were ticked."""
+        ticked = self.running()
+        for session in ticked:
+            session.engine.tick()
+        return ticked
+
+    def next_wakeup_ms(self):
+        """Milliseconds until the earliest running session needs a tick; None if none is running."""
+        wakeups = [session.engine.next_wakeup_ms() for session in self.running()]
+        return min(wakeups) if wakeups else None
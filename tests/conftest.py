@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+# The app is a set of flat modules next to counter.py, not an installed package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from engine import CounterEngine  # noqa: E402
+from journal import JournalWriter  # noqa: E402
+from timer import NS_PER_SECOND  # noqa: E402
+
+
+class FakeClock:
+    """A time.monotonic_ns stand-in that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += int(seconds * NS_PER_SECOND)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_engine(clock):
+    """Build CounterEngines on the fake clock; with a journal path, the run is started and journaled."""
+    def make(counters=(), duration=600, journal=None, **kwargs):
+        engine = CounterEngine(counters, duration=duration, clock=clock, **kwargs)
+        if journal is not None:
+            engine.start()
+            engine.attach_journal(JournalWriter(str(journal), flush_interval=0.01))
+        return engine
+    return make
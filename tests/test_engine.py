@@ -0,0 +1,55 @@
+from engine import FINISHED, RUNNING
+from timer import NS_PER_SECOND
+
+COUNTERS = [{'key': 'A', 'name': 'Car'}]
+
+
+def test_presses_past_the_duration_finish_the_run(clock, make_engine):
+    engine = make_engine(COUNTERS, duration=10)
+    finished = []
+    engine.subscribe('finished', finished.append)
+    engine.start()
+    clock.advance(9.5)
+    assert engine.increment('A') == 0
+    clock.advance(0.5)
+    assert engine.increment('A') is None
+    assert engine.state == FINISHED
+    assert finished == [[{'key': 'A', 'name': 'Car', 'count': 1}]]
+    assert list(engine.events.times) == [9.5 * NS_PER_SECOND]
+
+
+def test_batches_past_the_duration_finish_the_run(clock, make_engine):
+    engine = make_engine(COUNTERS, duration=10)
+    engine.start()
+    clock.advance(10)
+    assert engine.increment_many(['A']) == 0
+    assert engine.state == FINISHED
+    assert engine.results()[0]['count'] == 0
+
+
+def test_speed_scales_event_times(clock, make_engine):
+    engine = make_engine(COUNTERS, duration=10)
+    engine.set_speed(2.0)
+    engine.start()
+    clock.advance(1)
+    engine.increment('A')
+    assert engine.state == RUNNING
+    assert list(engine.events.times) == [2 * NS_PER_SECOND]
+
+
+def test_batches_share_one_time(clock, make_engine):
+    engine = make_engine(COUNTERS, duration=10)
+    engine.start()
+    clock.advance(1)
+    assert engine.increment_many(['A', 'B', 'A']) == 2
+    assert list(engine.events.times) == [NS_PER_SECOND] * 2
+
+
+def test_counted_presses_are_journaled(tmp_path, clock, make_engine):
+    engine = make_engine(COUNTERS, journal=tmp_path / 'run.journal')
+    clock.advance(1)
+    engine.increment('A')
+    engine.increment_many(['A', 'B'])
+    assert engine.journal_records == 2
+    engine.stop()
+    assert engine.journal is None
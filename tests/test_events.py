@@ -0,0 +1,66 @@
+import collections
+import random
+
+from events import MB, MIN_CAPACITY, EventLog, RollingEventLog
+from timer import NS_PER_SECOND
+
+
+def totals(log):
+    """Presses per slot, held one by one or folded into the rollups."""
+    counts = collections.Counter(log.slots)
+    rollup = log.rollup()
+    if rollup is not None:
+        for slot, count in zip(rollup[1], rollup[2]):
+            counts[slot] += count
+    return counts
+
+
+def fill(log, n, slots=5, step_ns=NS_PER_SECOND // 20, seed=1):
+    rng = random.Random(seed)
+    expected = collections.Counter()
+    for i in range(n):
+        slot = rng.randrange(slots)
+        log.append(i * step_ns, slot)
+        expected[slot] += 1
+    return expected
+
+
+def test_event_log_keeps_everything():
+    log = EventLog()
+    expected = fill(log, 1000)
+    assert len(log) == 1000
+    assert log.rollup() is None
+    assert totals(log) == expected
+
+
+def test_rolling_totals_are_exact_after_folding():
+    log = RollingEventLog(MB // 8)
+    expected = fill(log, 200000)  # About three hours at 20 presses per second
+    assert log.folded > 0
+    assert len(log) < log.capacity
+    assert totals(log) == expected
+    assert log.folded + len(log) == 200000
+
+
+def test_rolling_memory_stays_under_the_limit():
+    log = RollingEventLog(MB // 8)
+    fill(log, 200000, slots=50)
+    assert log.capacity >= MIN_CAPACITY
+    assert log.memory_bytes() <= log.memory_limit
+    assert log.before  # Old hours were merged into per-counter counts
+    assert log.before_ns == 0
+
+
+def test_rollup_times_are_bucket_starts():
+    log = RollingEventLog(MB // 8)
+    fill(log, 20000)
+    times, _, _ = log.rollup()
+    assert all(t_ns % NS_PER_SECOND == 0 for t_ns in times)
+    assert max(times) < log.times[0]
+
+
+def test_extend_merges_rollups():
+    first, second = RollingEventLog(MB // 8), RollingEventLog(MB // 8)
+    expected = fill(first, 50000) + fill(second, 50000, seed=2)
+    first.extend(second)
+    assert totals(first) == expected
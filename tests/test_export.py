@@ -0,0 +1,33 @@
+import pytest
+
+from export import ExportSource, ExportTask, export
+
+
+@pytest.fixture
+def finished_engine(clock, make_engine):
+    engine = make_engine([{'key': 'A', 'name': 'Car'}, {'key': 'B', 'name': 'Bus'}], duration=600)
+    engine.start()
+    for i in range(100):
+        clock.advance(3)
+        engine.increment('AB'[i % 2])
+    engine.stop()
+    return engine
+
+
+@pytest.mark.parametrize('dataset', ['totals', 'bins', 'events'])
+def test_row_count_matches_the_rows_written(tmp_path, finished_engine, dataset):
+    if dataset == 'bins':
+        pytest.importorskip('numpy')
+    source = ExportSource(finished_engine, bin_seconds=30)
+    written = []
+    export(source, dataset, str(tmp_path / f'{dataset}.csv'), written.append)
+    assert sum(written) == source.row_count(dataset)
+    assert len((tmp_path / f'{dataset}.csv').read_text().splitlines()) == source.row_count(dataset) + 1
+
+
+def test_bins_progress_counts_every_row(tmp_path, finished_engine):
+    pytest.importorskip('numpy')
+    task = ExportTask(ExportSource(finished_engine, bin_seconds=30), 'bins', str(tmp_path / 'bins.csv'))
+    task._thread.join()
+    assert task.error is None
+    assert task.total == task.written == 2 * 10  # Two counters, 300 s in 30 s bins
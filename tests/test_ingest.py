@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from ingest import MAGIC, MAX_COUNT, MAX_LINE, RECORD, Decoder, IngestServer, decode
+
+
+def binary(key, count=1):
+    data = key.encode('utf-8')
+    return RECORD.pack(len(data), count) + data
+
+
+def test_line_protocol():
+    decoder = Decoder()
+    assert decoder.feed(b'a\ncontrol-k 3\n\n') == [('A', 1), ('CONTROL-K', 3)]
+    assert decoder.binary is False
+
+
+def test_lines_split_across_reads():
+    decoder = Decoder()
+    assert decoder.feed(b'F') == []  # Could still be the start of MAGIC
+    assert decoder.feed(b'1 2\nB') == [('F1', 2)]
+    assert decoder.feed(b'\n') == [('B', 1)]
+
+
+def test_malformed_and_out_of_range_lines_are_skipped():
+    assert decode(b'A x\nA 0\nA 70000\nB 2') == [('B', 2)]
+
+
+def test_overlong_line_raises():
+    with pytest.raises(ValueError):
+        Decoder().feed(b'A' * (MAX_LINE + 1))
+
+
+def test_binary_protocol():
+    decoder = Decoder()
+    assert decoder.feed(MAGIC + binary('a') + binary('control-a', 2)) == [('A', 1), ('CONTROL-A', 2)]
+    assert decoder.binary is True
+
+
+def test_binary_split_anywhere():
+    data = MAGIC + binary('a') + binary('b', 3) + binary('f1', 0)
+    expected = [('A', 1), ('B', 3)]
+    for cut in range(1, len(data)):
+        decoder = Decoder()
+        assert decoder.feed(data[:cut]) + decoder.feed(data[cut:]) == expected
+        assert decoder.buffer == b''
+
+
+def test_large_counts_stay_small_until_drained():
+    server = IngestServer(tcp_port=0, max_keys=10 * MAX_COUNT)
+    counts = decode(b'A %d\n' % MAX_COUNT * 128)  # 8.4M presses in 1 KB
+    assert len(counts) == 128
+    asyncio.run(server._put(counts))
+    assert server.pending == server.received == 128 * MAX_COUNT
+    keys = server.drain(1000)
+    assert keys == ['A'] * 1000
+    assert server.pending == 128 * MAX_COUNT - 1000
+
+
+def test_queue_is_bounded_by_presses():
+    server = IngestServer(udp_port=0, max_keys=100)
+    server.offer([('A', 60)])
+    server.offer([('B', 60)])  # Would go past max_keys
+    assert (server.pending, server.dropped) == (60, 60)
+    assert server.drain(50) == ['A'] * 50
+    server.offer([('B', 50)])
+    assert server.drain() == ['A'] * 10 + ['B'] * 50
+    assert server.pending == 0
+
+
+def test_readers_wait_for_room():
+    server = IngestServer(tcp_port=0, max_keys=100)
+
+    async def run():
+        await server._put([('A', 80)])
+        second = asyncio.ensure_future(server._put([('B', 80)]))
+        await asyncio.sleep(0.01)
+        assert not second.done()  # Held back: no more reads until the UI catches up
+        assert server.drain() == ['A'] * 80
+        await asyncio.wait_for(second, 1)
+
+    asyncio.run(run())
+    assert server.drain() == ['B'] * 80
@@ -0,0 +1,78 @@
+import pytest
+
+from journal import HEADER, KEY_BYTES, MAGIC, RECORD, RECORDS, JournalWriter, read_events, read_totals, record_count
+
+
+def write_journal(path, records):
+    journal = JournalWriter(str(path), flush_interval=0.01)
+    for record in records:
+        journal.append(*record)
+    journal.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'run.journal'
+    long_key = 'CONTROL-ALT-K ' * 4 + 'C'
+    assert len(long_key) <= KEY_BYTES
+    records = [(i * 1000, i % 3, key) for i, key in enumerate(['A', long_key, 'F1'] * 4)]
+    write_journal(path, records)
+    assert list(read_events(str(path))) == records
+    assert list(read_events(str(path), offset=10)) == records[10:]
+    assert record_count(str(path)) == len(records)
+    assert read_totals(str(path)) == {'A': 4, long_key: 4, 'F1': 4}
+
+
+def test_reopened_journal_appends(tmp_path):
+    path = tmp_path / 'run.journal'
+    write_journal(path, [(1, 0, 'A')])
+    journal = JournalWriter(str(path))
+    assert journal.written == 1
+    journal.append(2, 0, 'A')
+    journal.close()
+    assert [t_ns for t_ns, _, _ in read_events(str(path))] == [1, 2]
+
+
+def test_wait_written(tmp_path):
+    journal = JournalWriter(str(tmp_path / 'run.journal'), flush_interval=0.01)
+    journal.append(1, 0, 'A')
+    journal.append(2, 0, 'A')
+    assert journal.wait_written(2, timeout=5)
+    journal.close()
+    assert journal.written == 2
+
+
+def test_torn_record_is_ignored_and_truncated(tmp_path):
+    path = tmp_path / 'run.journal'
+    write_journal(path, [(1, 0, 'A'), (2, 1, 'B')])
+    with open(path, 'ab') as f:
+        f.write(RECORD.pack(3, 0, b'A')[:5])  # A crash mid-write
+    assert list(read_events(str(path))) == [(1, 0, 'A'), (2, 1, 'B')]
+    assert record_count(str(path)) == 2
+    write_journal(path, [(4, 0, 'A')])
+    assert list(read_events(str(path))) == [(1, 0, 'A'), (2, 1, 'B'), (4, 0, 'A')]
+    assert path.stat().st_size == HEADER.size + 3 * RECORD.size
+
+
+@pytest.mark.parametrize('data', [b'', b'ATC', b'NOPE\x01\x00\x24\x00'])
+def test_bad_header_raises_value_error(tmp_path, data):
+    path = tmp_path / 'bad.journal'
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        list(read_events(str(path)))
+
+
+def test_torn_header_is_rewritten(tmp_path):
+    path = tmp_path / 'run.journal'
+    path.write_bytes(b'ATC')
+    write_journal(path, [(1, 0, 'A')])
+    assert list(read_events(str(path))) == [(1, 0, 'A')]
+
+
+def test_version_1_journals_are_read_and_appended_to(tmp_path):
+    path = tmp_path / 'old.journal'
+    v1 = RECORDS[1]
+    path.write_bytes(HEADER.pack(MAGIC, 1, v1.size) + v1.pack(1, 0, b'A'))
+    assert record_count(str(path)) == 1
+    write_journal(path, [(2, 1, 'B')])
+    assert list(read_events(str(path))) == [(1, 0, 'A'), (2, 1, 'B')]
+    assert path.stat().st_size == HEADER.size + 2 * v1.size
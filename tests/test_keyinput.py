@@ -0,0 +1,60 @@
+from keyinput import InputEngine
+from metrics import Metrics
+from registry import CounterRegistry
+
+
+def make_input(counters, clock, **kwargs):
+    return InputEngine(CounterRegistry(counters), clock=clock, **kwargs)
+
+
+def test_plain_keys_and_chords(clock):
+    engine = make_input([{'key': 'A', 'name': 'Car'}, {'key': 'CONTROL-A', 'name': 'Truck'}], clock)
+    assert engine.press('A') == 'A'
+    assert engine.press('CONTROL-A') == 'CONTROL-A'
+    assert engine.press('B') is None
+
+
+def test_sequence(clock):
+    engine = make_input([{'key': 'CONTROL-K C', 'name': 'Comment'}, {'key': 'C', 'name': 'Car'}], clock)
+    assert engine.press('CONTROL-K') is None
+    assert engine.press('CONTROL_L') is None  # Reaching for Control does not break it
+    assert engine.press('C') == 'CONTROL-K C'
+    assert engine.press('C') == 'C'
+
+
+def test_sequence_times_out(clock):
+    engine = make_input([{'key': 'G G', 'name': 'Top'}], clock, sequence_timeout=0.5)
+    assert engine.press('G') is None
+    clock.advance(0.6)
+    assert engine.press('G') is None  # Starts over instead of completing
+    clock.advance(0.1)
+    assert engine.press('G') == 'G G'
+
+
+def test_broken_sequence_starts_a_new_one(clock):
+    engine = make_input([{'key': 'G G', 'name': 'Top'}, {'key': 'B', 'name': 'Bus'}], clock)
+    engine.press('G')
+    assert engine.press('B') == 'B'
+    assert engine.press('G') is None
+
+
+def test_shorter_binding_wins(clock):
+    engine = make_input([{'key': 'CONTROL-K', 'name': 'Kill'}, {'key': 'CONTROL-K C', 'name': 'Comment'}], clock)
+    assert engine.press('CONTROL-K') == 'CONTROL-K'
+    assert engine.press('C') is None
+
+
+def test_debounce(clock):
+    metrics = Metrics(enabled=True)
+    engine = make_input([{'key': 'A', 'name': 'Car', 'debounce_ms': 50}, {'key': 'B', 'name': 'Bus'}], clock,
+                         metrics=metrics)
+    assert engine.press('A') == 'A'
+    clock.advance(0.02)
+    assert engine.press('A') is None
+    assert engine.press('B') == 'B'
+    assert engine.press('B') == 'B'  # No window
+    clock.advance(0.04)  # 60 ms after the accepted press; the bounce did not extend the window
+    assert engine.press('A') == 'A'
+    assert metrics.counters['bounces_rejected_total'][1] == 1
+    engine.reset()
+    assert engine.press('A') == 'A'
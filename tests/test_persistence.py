@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from persistence import CONFIG_VERSION, ConfigStore, migrate, read_config, validate
+
+
+def config(*counters, **fields):
+    return dict({'version': 1, 'counters': list(counters), 'duration': 900}, **fields)
+
+
+def test_migrate_unversioned():
+    migrated = migrate({'counters': [{'key': 'control - a', 'name': 'Car', 'extra': 1}]})
+    assert migrated == {'version': 1, 'counters': [{'key': 'CONTROL-A', 'name': 'Car'}], 'duration': 900}
+
+
+def test_migrate_normalizes_every_version():
+    migrated = migrate(config({'key': 'f1', 'name': 'Car', 'debounce_ms': 5}))
+    assert migrated['counters'] == [{'key': 'F1', 'name': 'Car', 'debounce_ms': 5}]
+
+
+@pytest.mark.parametrize('version', [0, CONFIG_VERSION])
+def test_keys_that_normalize_alike_are_duplicates(version):
+    counters = [{'key': 'a', 'name': 'Car'}, {'key': 'A', 'name': 'Bus'}]
+    with pytest.raises(ValueError, match="more than one counter"):
+        validate(migrate({'version': version, 'counters': counters, 'duration': 60}))
+
+
+def test_newer_version_is_rejected():
+    with pytest.raises(ValueError, match="newer"):
+        migrate(config(version=CONFIG_VERSION + 1))
+    with pytest.raises(ValueError):
+        migrate([])
+
+
+@pytest.mark.parametrize('bad', [
+    {'counters': {}},
+    {'counters': [{'key': 'A'}]},
+    {'counters': [{'key': 1, 'name': 'Car'}]},
+    {'counters': [{'key': '', 'name': 'Car'}]},
+    {'counters': [{'key': 'CONTROL-ALT-K ' * 5, 'name': 'Car'}]},
+    {'counters': [{'key': 'A', 'name': 'Car', 'debounce_ms': -1}]},
+    {'counters': [{'key': 'A', 'name': 'Car', 'debounce_ms': True}]},
+    {'duration': 0},
+    {'duration': '900'},
+    {'memory_limit_mb': 0},
+])
+def test_validate_rejects(bad):
+    with pytest.raises(ValueError):
+        validate(migrate(dict(config({'key': 'A', 'name': 'Car'}), **bad)))
+
+
+def test_validate_accepts():
+    good = config({'key': 'A', 'name': 'Car', 'debounce_ms': 2.5}, memory_limit_mb=64)
+    assert validate(migrate(good)) == good
+
+
+def test_read_config_reports_malformed_files(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'counters': [{'name': 'no key'}]}))
+    with pytest.raises(ValueError, match="Malformed"):
+        read_config(str(path))
+
+
+def test_store_writes_the_last_save_on_close(tmp_path):
+    path = tmp_path / 'config.json'
+    store = ConfigStore(str(path), debounce=60)
+    store.save(config({'key': 'A', 'name': 'Car'}, duration=60))
+    store.save(config({'key': 'B', 'name': 'Bus'}, duration=120))
+    store.close()
+    assert read_config(str(path))['counters'] == [{'key': 'B', 'name': 'Bus'}]
+    store = ConfigStore(str(path))
+    assert store.load()['duration'] == 120
+    store.close()
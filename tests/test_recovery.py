@@ -0,0 +1,108 @@
+import os
+
+from engine import FINISHED, PAUSED, RUNNING
+from journal import JournalWriter, record_count
+from recovery import (find_all_interrupted, find_interrupted, load_event_history, prune_journals, read_snapshot,
+                      recover, snapshot_path)
+
+LONG_KEY = 'CONTROL-ALT-K CONTROL-ALT-C'  # Longer than the keys of version 1 journals
+COUNTERS = [{'key': 'A', 'name': 'Car'}, {'key': 'B', 'name': 'Bus'}, {'key': LONG_KEY, 'name': 'Comment'}]
+
+
+def press(engine, clock, keys):
+    for key in keys:
+        clock.advance(0.1)
+        engine.increment(key)
+
+
+def crash(engine):
+    """Leave the run as a crash would: records on disk, the last snapshot older than them."""
+    assert engine.journal.wait_written(engine.journal_records, timeout=5)
+    engine.journal.close()
+
+
+def recovered_engine(directory, make_engine):
+    engine = make_engine()
+    path = find_interrupted(str(directory))
+    assert path is not None
+    snapshot = recover(engine, path)
+    return engine, snapshot
+
+
+def test_snapshot_crash_recover_crash(tmp_path, clock, make_engine):
+    journal_path = tmp_path / 'run.journal'
+    engine = make_engine(COUNTERS, journal=journal_path)
+    press(engine, clock, 'AAAB')
+    engine.checkpoint(background=False)
+    press(engine, clock, 'BBA')  # Only in the journal
+    crash(engine)
+
+    engine, snapshot = recovered_engine(tmp_path, make_engine)
+    assert snapshot['events'] == 4
+    assert engine.state == PAUSED
+    assert [r['count'] for r in engine.results()] == [4, 3, 0]
+    assert engine.journal_records == record_count(str(journal_path)) == 7
+    assert engine.elapsed_time == 0.7
+
+    engine.attach_journal(JournalWriter(snapshot['journal'], flush_interval=0.01))
+    engine.resume()
+    assert engine.state == RUNNING
+    press(engine, clock, 'AB')
+    engine.checkpoint(background=False)
+    press(engine, clock, 'A')
+    crash(engine)
+
+    engine, snapshot = recovered_engine(tmp_path, make_engine)
+    assert snapshot['events'] == 9
+    assert [r['count'] for r in engine.results()] == [6, 4, 0]
+    assert engine.journal_records == 10
+    history = load_event_history(snapshot['journal'], dict(engine.counters.index), snapshot['events'])
+    engine.merge_event_history(history)
+    assert len(engine.events) == 10
+    assert list(engine.events.times) == sorted(engine.events.times)
+
+
+def test_finished_run_leaves_no_snapshot(tmp_path, clock, make_engine):
+    journal_path = tmp_path / 'run.journal'
+    engine = make_engine(COUNTERS, journal=journal_path)
+    press(engine, clock, 'AB')
+    engine.checkpoint(background=False)
+    assert find_all_interrupted(str(tmp_path)) == [snapshot_path(str(journal_path))]
+    engine.stop()
+    assert engine.state == FINISHED
+    assert not os.path.exists(snapshot_path(str(journal_path)))
+    assert find_all_interrupted(str(tmp_path)) == []
+    assert record_count(str(journal_path)) == 2  # Kept for replay
+
+
+def test_closing_a_running_session_keeps_it_recoverable(tmp_path, clock, make_engine):
+    engine = make_engine(COUNTERS, journal=tmp_path / 'run.journal')
+    press(engine, clock, 'AAB')
+    engine.close_journal()
+    snapshot = read_snapshot(find_interrupted(str(tmp_path)))
+    assert snapshot['events'] == 3
+    assert snapshot['state'] == RUNNING
+
+
+def test_prune_journals(tmp_path):
+    old, recoverable, recent = (tmp_path / name for name in ('old.journal', 'crashed.journal', 'new.journal'))
+    for path in (old, recoverable, recent):
+        path.write_bytes(b'')
+    (tmp_path / 'crashed.journal.snapshot').write_text('{}')
+    for path in (old, recoverable):
+        os.utime(path, (0, 0))
+    assert prune_journals(str(tmp_path), max_age_days=30) == 1
+    assert not old.exists()
+    assert recoverable.exists() and recent.exists()
+
+
+def test_long_keys_survive_a_crash(tmp_path, clock, make_engine):
+    engine = make_engine(COUNTERS, journal=tmp_path / 'run.journal')
+    press(engine, clock, [LONG_KEY] * 5)
+    engine.checkpoint(background=False)
+    press(engine, clock, [LONG_KEY])
+    crash(engine)
+    engine, snapshot = recovered_engine(tmp_path, make_engine)
+    assert engine.counters.count(LONG_KEY) == 6
+    history = load_event_history(snapshot['journal'], dict(engine.counters.index), snapshot['events'])
+    assert len(history) == 5
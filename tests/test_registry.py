@@ -0,0 +1,61 @@
+import pytest
+
+from registry import MAX_KEY_BYTES, CounterRegistry, key_from_event, normalize_key
+
+SHIFT_LOCK = 0x0002  # CapsLock
+CONTROL = 0x0004
+MOD1 = 0x0008  # Alt on X11, NumLock on Windows
+MOD2 = 0x0010  # NumLock on X11
+WINDOWS_ALT = 0x20000
+
+
+class KeyEvent:
+    def __init__(self, keysym, state=0):
+        self.keysym = keysym
+        self.state = state
+
+
+@pytest.mark.parametrize('system', ['win32', 'x11', 'aqua'])
+@pytest.mark.parametrize('state', [0, SHIFT_LOCK, MOD2, SHIFT_LOCK | MOD2])
+def test_lock_keys_do_not_make_a_chord(system, state):
+    assert key_from_event(KeyEvent('a', state), system) == 'A'
+
+
+def test_numlock_on_windows_is_not_alt():
+    assert key_from_event(KeyEvent('a', MOD1), 'win32') == 'A'
+    assert key_from_event(KeyEvent('a', MOD1 | SHIFT_LOCK), 'win32') == 'A'
+    assert key_from_event(KeyEvent('a', MOD1 | CONTROL), 'win32') == 'CONTROL-A'
+
+
+def test_alt_bits():
+    assert key_from_event(KeyEvent('a', MOD1), 'x11') == 'ALT-A'
+    assert key_from_event(KeyEvent('a', WINDOWS_ALT | MOD1), 'win32') == 'ALT-A'
+    assert key_from_event(KeyEvent('a', CONTROL | MOD1 | MOD2), 'x11') == 'CONTROL-ALT-A'
+
+
+def test_modifier_keys_stay_plain():
+    assert key_from_event(KeyEvent('Control_L', CONTROL), 'x11') == 'CONTROL_L'
+
+
+def test_normalize_key():
+    assert normalize_key('control - a') == 'CONTROL-A'
+    assert normalize_key('  control-k   c ') == 'CONTROL-K C'
+    assert normalize_key('f1') == 'F1'
+
+
+def test_registry_add_remove():
+    registry = CounterRegistry([{'key': 'A', 'name': 'Car'}])
+    with pytest.raises(KeyError):
+        registry.add('A', 'Again')
+    registry.increment('A')
+    assert registry.count('A') == 1
+    registry.remove('A')
+    assert registry.increment('A') is None
+    assert 'A' not in registry
+
+
+def test_registry_rejects_keys_too_long_for_the_journal():
+    registry = CounterRegistry()
+    registry.add('X' * MAX_KEY_BYTES, 'Longest')
+    with pytest.raises(ValueError):
+        registry.add('X' * (MAX_KEY_BYTES + 1), 'Too long')
@@ -0,0 +1,54 @@
+import pytest
+
+from replay import main, read_records, replay_files
+
+CONFIG = {'version': 1, 'counters': [{'key': 'A', 'name': 'Car'}], 'duration': 60}
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_records_from_exports(tmp_path):
+    csv_path = write(tmp_path / 'run.csv', 'Time (ns),Key,Object Name\n5,a,Car\n')
+    jsonl_path = write(tmp_path / 'run.jsonl', '{"time_ns": 5, "key": "a"}\n\n')
+    assert list(read_records(csv_path)) == list(read_records(jsonl_path)) == [(5, None, 'A')]
+
+
+@pytest.mark.parametrize('name, text', [
+    ('short.csv', 'Time (ns),Key,Object Name\n5\n'),
+    ('text.csv', 'Time (ns),Key,Object Name\nsoon,A,Car\n'),
+    ('list.jsonl', '[5, "A"]\n'),
+    ('missing.jsonl', '{"time_ns": 5}\n'),
+])
+def test_malformed_rows_raise_value_error(tmp_path, name, text):
+    with pytest.raises(ValueError, match=name):
+        list(read_records(write(tmp_path / name, text)))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_one_bad_file_does_not_stop_the_others(tmp_path, workers):
+    good = write(tmp_path / 'good.csv', 'Time (ns),Key,Object Name\n5,A,Car\n6,A,Car\n')
+    bad = write(tmp_path / 'bad.csv', 'Time (ns),Key,Object Name\n5\n')
+    results = {path: (result, error) for path, result, error in replay_files([good, bad], CONFIG, workers=workers)}
+    assert results[good][0]['counted'] == 2
+    assert isinstance(results[bad][1], ValueError)
+
+
+def test_cli_reports_failures(tmp_path, capsys):
+    config = write(tmp_path / 'c.json', '{"counters": [{"key": "A", "name": "Car"}], "duration": 60}')
+    good = write(tmp_path / 'good.csv', 'Time (ns),Key,Object Name\n5,A,Car\n')
+    bad = write(tmp_path / 'bad.csv', 'Time (ns),Key,Object Name\n5\n')
+    assert main([config, good, bad, '--workers', '2']) == 1
+    out, err = capsys.readouterr()
+    assert '1 presses' in out
+    assert 'bad.csv' in err
+
+
+def test_replay_scales_debounce_by_speed(make_engine):
+    engine = make_engine([{'key': 'A', 'name': 'Car', 'debounce_ms': 10}], duration=10)
+    records = [(i * 15_000_000, None, 'A') for i in range(10)]  # Every 15 ms of session time
+    assert engine.replay(records) == 10
+    assert engine.replay(records, speed=2.0) == 5  # 7.5 ms apart in real time
+    assert engine.replay(records + [(11 * 10 ** 9, None, 'A')]) == 10  # Past the duration
@@ -0,0 +1,66 @@
+from timer import NS_PER_SECOND, SegmentTimer
+
+
+def test_elapsed_while_running(clock):
+    timer = SegmentTimer(clock=clock)
+    assert timer.elapsed_ns() == 0
+    timer.start()
+    clock.advance(2.5)
+    assert timer.elapsed_ns() == 2.5 * NS_PER_SECOND
+    assert timer.elapsed() == 2.5
+
+
+def test_pauses_are_not_counted(clock):
+    timer = SegmentTimer(clock=clock)
+    timer.start()
+    clock.advance(3)
+    timer.stop()
+    clock.advance(100)
+    assert timer.elapsed_ns() == 3 * NS_PER_SECOND
+    timer.start()
+    clock.advance(2)
+    assert timer.elapsed_ns() == 5 * NS_PER_SECOND
+    assert len(timer.segments) == 1
+
+
+def test_speed_change_keeps_earlier_time_at_its_rate(clock):
+    timer = SegmentTimer(clock=clock)
+    timer.start()
+    clock.advance(10)
+    timer.set_speed(2.0)
+    clock.advance(5)
+    assert timer.elapsed_ns() == 20 * NS_PER_SECOND
+    timer.stop()
+    timer.set_speed(0.5)  # While stopped: nothing to split
+    timer.start()
+    clock.advance(4)
+    assert timer.elapsed_ns() == 22 * NS_PER_SECOND
+    assert [speed for _, _, speed in timer.segments] == [1.0, 2.0]
+
+
+def test_ns_until_is_real_time(clock):
+    timer = SegmentTimer(speed=4.0, clock=clock)
+    assert timer.ns_until(NS_PER_SECOND) is None
+    timer.start()
+    clock.advance(1)
+    assert timer.ns_until(8 * NS_PER_SECOND) == NS_PER_SECOND
+    assert timer.ns_until(0) == 0
+
+
+def test_next_wakeup_stops_at_the_limit(clock):
+    timer = SegmentTimer(clock=clock)
+    timer.start()
+    clock.advance(0.25)
+    assert timer.next_wakeup_ns(10 * NS_PER_SECOND) == 0.75 * NS_PER_SECOND
+    assert timer.next_wakeup_ns(NS_PER_SECOND // 2) == 0.25 * NS_PER_SECOND
+
+
+def test_restore_continues_stopped(clock):
+    timer = SegmentTimer(clock=clock)
+    timer.restore(7 * NS_PER_SECOND, [[0, 7 * NS_PER_SECOND, 1.0]], 1.5)
+    clock.advance(5)
+    assert timer.elapsed_ns() == 7 * NS_PER_SECOND
+    timer.start()
+    clock.advance(2)
+    assert timer.elapsed_ns() == 10 * NS_PER_SECOND
+    assert timer.segments == [(0, 7 * NS_PER_SECOND, 1.0)]
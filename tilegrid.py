@@ -0,0 +1,176 @@
+import platform
+import tkinter as tk
+from tkinter import ttk
+
+BUFFER_ROWS = 2  # Rows built above and below the visible ones so short scrolls need no rebinding
+MIN_TILE_WIDTH = 160
+TILE_GAP = 10  # Space between tiles, in pixels
+OFFSCREEN = -100000  # Canvas coordinate that parks unused tiles outside the scroll region
+
+
+class _Tile:
+    """The widgets of one tile, rebound to whichever counter it currently shows."""
+
+    __slots__ = ('frame', 'name_label', 'key_label', 'count_var', 'item', 'key')
+
+    def __init__(self, grid):
+        self.key = None
+        self.frame = ttk.Frame(grid.canvas, relief="solid", padding=10)
+        # Object Name (Bold), Key Instruction (Regular, smaller) and Count (Bold, larger)
+        self.name_label = ttk.Label(self.frame, font=grid.fonts[0])
+        self.name_label.pack()
+        self.key_label = ttk.Label(self.frame, font=grid.fonts[1])
+        self.key_label.pack()
+        self.count_var = tk.IntVar(self.frame)
+        ttk.Label(self.frame, textvariable=self.count_var, font=grid.fonts[2]).pack()
+        # Remove Button (Underneath the labels)
+        ttk.Button(self.frame, text="Remove", command=lambda: grid.on_remove(self.key)).pack(pady=(5, 0))
+        grid.bind_wheel(self.frame)
+        self.item = grid.canvas.create_window(OFFSCREEN, OFFSCREEN, window=self.frame, anchor="nw")
+
+    def bind(self, key, name, count):
+        self.key = key
+        self.name_label.config(text=name)
+        self.key_label.config(text=f"Press '{key}'")
+        self.count_var.set(count)
+
+
+class VirtualTileGrid(ttk.Frame):
+    """Scrollable grid of counter tiles that only builds the tiles in view.
+
+    Tiles have a fixed size and sit at computed canvas positions, so the
+    scroll region is known without measuring widgets. Scrolling or resizing
+    rebinds a small pool of tile widgets to the counters that are visible
+    (plus BUFFER_ROWS either side); its cost depends on the window size, not
+    on the number of counters. The column count follows the window width.
+    """
+
+    def __init__(self, parent, counters, fonts, on_remove):
+        super().__init__(parent)
+        self.counters = counters  # registry.CounterRegistry
+        self.fonts = fonts  # (name, key, count) fonts
+        self.on_remove = on_remove
+        self.order = []  # Keys in display order
+        self.visible = {}  # key -> bound _Tile
+        self.pool = []  # Unbound tiles ready for reuse
+        self.tile_width = self.tile_height = 0  # Measured lazily from a real tile
+        self.columns = 1
+        self._layout = None
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.bind("<Configure>", self.refresh)
+        self.bind_wheel(self.canvas)
+        # Ensure focus on the canvas
+        self.canvas.bind("<Button-1>", lambda event: self.canvas.focus_set())
+        self.set_counters()
+
+    def bind_wheel(self, widget):
+        if platform.system() == "Linux":
+            widget.bind("<Button-4>", self.on_mouse_wheel)  # Scroll up
+            widget.bind("<Button-5>", self.on_mouse_wheel)  # Scroll down
+        else:
+            widget.bind("<MouseWheel>", self.on_mouse_wheel)  # Windows and macOS
+
+    def on_mouse_wheel(self, event):
+        """Handle mouse wheel scrolling for the canvas."""
+        if platform.system() == "Windows":
+            # On Windows, the delta value is usually larger (e.g., 120)
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        elif platform.system() == "Darwin":  # macOS
+            # On macOS, the delta value is smaller (e.g., 1 or -1)
+            self.canvas.yview_scroll(-1 * event.delta, "units")
+        else:  # Linux
+            # On Linux, Button-4 is scroll up, Button-5 is scroll down
+            if event.num == 4:
+                self.canvas.yview_scroll(-1, "units")
+            elif event.num == 5:
+                self.canvas.yview_scroll(1, "units")
+        self.refresh()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def set_counters(self):
+        """Pick up added, removed or reloaded counters."""
+        self.order = list(self.counters)
+        for key in list(self.visible):  # A re-added key may carry a new name, so rebind everything in view
+            self._release(key)
+        self._layout = None
+        self.refresh()
+
+    def relayout(self):
+        """Re-measure the tiles, e.g. after the fonts changed size."""
+        self.tile_width = self.tile_height = 0
+        self._layout = None
+        self.refresh()
+
+    def update_count(self, key):
+        """Refresh the count label of key if its tile is built; off-screen counters cost nothing."""
+        tile = self.visible.get(key)
+        if tile is not None:
+            tile.count_var.set(self.counters.count(key))
+
+    def update_counts(self):
+        for key in self.visible:
+            self.update_count(key)
+
+    def _measure(self):
+        tile = self.pool[-1] if self.pool else self._new_tile()
+        tile.bind("M" * 12, "M" * 12, 0)  # A typical single-line name
+        tile.frame.update_idletasks()
+        tile.key = None
+        self.tile_width = max(MIN_TILE_WIDTH, tile.frame.winfo_reqwidth()) + TILE_GAP
+        self.tile_height = tile.frame.winfo_reqheight() + TILE_GAP
+        for tile in self.pool + list(self.visible.values()):
+            self.canvas.itemconfigure(tile.item, width=self.tile_width - TILE_GAP, height=self.tile_height - TILE_GAP)
+        self.canvas.configure(yscrollincrement=self.tile_height // 4)
+
+    def _new_tile(self):
+        tile = _Tile(self)
+        if self.tile_width:
+            self.canvas.itemconfigure(tile.item, width=self.tile_width - TILE_GAP, height=self.tile_height - TILE_GAP)
+        self.pool.append(tile)
+        return tile
+
+    def _release(self, key):
+        tile = self.visible.pop(key)
+        tile.key = None
+        self.canvas.coords(tile.item, OFFSCREEN, OFFSCREEN)
+        self.pool.append(tile)
+
+    def refresh(self, event=None):
+        """Bind tiles to the counters in view and place them."""
+        if not self.tile_width:
+            self._measure()
+        tile_width, tile_height = self.tile_width, self.tile_height
+        columns = max(1, self.canvas.winfo_width() // tile_width)
+        n = len(self.order)
+        rows = -(-n // columns)
+        layout = (columns, n)
+        if layout != self._layout:
+            self._layout = layout
+            self.columns = columns
+            self.canvas.configure(scrollregion=(0, 0, columns * tile_width, rows * tile_height))
+        top = self.canvas.canvasy(0)
+        first_row = max(0, int(top // tile_height) - BUFFER_ROWS)
+        last_row = min(rows, int((top + self.canvas.winfo_height()) // tile_height) + 1 + BUFFER_ROWS)
+        start = first_row * columns
+        wanted = self.order[start:min(n, last_row * columns)]
+        wanted_keys = set(wanted)
+        for key in [key for key in self.visible if key not in wanted_keys]:
+            self._release(key)
+        counters, visible, coords = self.counters, self.visible, self.canvas.coords
+        for idx, key in enumerate(wanted, start):
+            tile = visible.get(key)
+            if tile is None:
+                if not self.pool:
+                    self._new_tile()
+                tile = self.pool.pop()
+                tile.bind(key, counters.name(key), counters.count(key))
+                visible[key] = tile
+            row, column = divmod(idx, columns)
+            coords(tile.item, column * tile_width + TILE_GAP // 2, row * tile_height + TILE_GAP // 2)
@@ -0,0 +1,91 @@
+import time
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MS = 1_000_000
+
+
+class SegmentTimer:
+    """Scaled elapsed time measured on time.monotonic_ns().
+
+    The run is a sequence of segments, each with its own speed. A segment
+    is closed on pause or speed change and its scaled length is added to
+    ``closed_ns``, so elapsed time stays exact no matter how often the
+    speed changes and is never affected by wall clock adjustments.
+    """
+
+    __slots__ = ('clock', 'speed', 'segments', 'closed_ns', 'segment_start')
+
+    def __init__(self, speed=1.0, clock=time.monotonic_ns):
+        self.clock = clock
+        self.speed = speed
+        self.segments = []  # Closed segments as (start_ns, end_ns, speed)
+        self.closed_ns = 0  # Scaled ns covered by the closed segments
+        self.segment_start = None  # Start of the open segment; None while stopped
+
+    @property
+    def running(self):
+        return self.segment_start is not None
+
+    def start(self, now=None):
+        """Open a new segment at the current speed (start or resume)."""
+        if self.segment_start is None:
+            self.segment_start = self.clock() if now is None else now
+
+    def stop(self, now=None):
+        """Close the open segment (pause or stop)."""
+        if self.segment_start is None:
+            return
+        now = self.clock() if now is None else now
+        self.closed_ns += int((now - self.segment_start) * self.speed)
+        self.segments.append((self.segment_start, now, self.speed))
+        self.segment_start = None
+
+    def set_speed(self, speed, now=None):
+        """Change the speed, splitting the open segment so earlier time keeps its old rate."""
+        if self.segment_start is not None:
+            now = self.clock() if now is None else now
+            self.stop(now)
+            self.speed = speed
+            self.start(now)
+        else:
+            self.speed = speed
+
+    def reset(self):
+        self.segments.clear()
+        self.closed_ns = 0
+        self.segment_start = None
+
+    def restore(self, elapsed_ns, segments, speed):
+        """Continue a run recovered from a snapshot, stopped at elapsed_ns."""
+        self.segments = [tuple(segment) for segment in segments]
+        self.closed_ns = elapsed_ns
+        self.segment_start = None
+        self.speed = speed
+
+    def elapsed_ns(self, now=None):
+        if self.segment_start is None:
+            return self.closed_ns
+        elapsed = (self.clock() if now is None else now) - self.segment_start
+        if self.speed != 1:  # Stays an int at normal speed; int(float) is the costly part per keypress
+            elapsed = int(elapsed * self.speed)
+        return self.closed_ns + elapsed
+
+    def elapsed(self, now=None):
+        """Elapsed scaled time in seconds."""
+        return self.elapsed_ns(now) / NS_PER_SECOND
+
+    def ns_until(self, target_ns, now=None):
+        """Real (unscaled) ns until the scaled elapsed time reaches target_ns; None while stopped."""
+        if self.segment_start is None:
+            return None
+        remaining = target_ns - self.elapsed_ns(now)
+        return max(0, remaining) / self.speed
+
+    def next_wakeup_ns(self, limit_ns, now=None):
+        """Real ns until the next whole displayed second or limit_ns, whichever comes first."""
+        if self.segment_start is None:
+            return None
+        now = self.clock() if now is None else now
+        elapsed = self.elapsed_ns(now)
+        boundary = min((elapsed // NS_PER_SECOND + 1) * NS_PER_SECOND, limit_ns)
+        return max(0, boundary - elapsed) / self.speed